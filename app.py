@@ -2,28 +2,28 @@
 
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 import numpy as np
 import warnings
 import platform
-import plotly.express as px
-from scipy import stats
+import hashlib
+import os
+from plotly.colors import qualitative
 import streamlit.components.v1 as components
 
-
-# openpyxl 사용
-import openpyxl
-try:
-    # openpyxl로 시도
-    import pandas as pd
-    pd.read_excel('data/sample_data.xlsx', engine='openpyxl')
-except:
-    # 실패하면 pandas로 폴백
-    import pandas as pd
-    pd.read_excel('data/sample_data.xlsx')
+# scipy.stats, plotly.express는 가져오는 데 오래 걸리므로 사용하는 함수 안에서 가져옴
 
 from datetime import datetime, timedelta
 
+from data_loader import (
+    DEFAULT_ENGINE, INGEST_WORKERS, UPLOAD_WORKERS, ItemIndex, LazyWorkbook, SheetCache, is_csv_file,
+    merge_catalog, merge_workbook, read_csv_workbook, read_files, read_workbook_cached,
+)
+from directory_watcher import WATCH_DIR, DirectoryWatcher
+from history_store import HISTORY_BACKEND, HISTORY_BACKENDS, HISTORY_DB_PATH
+from item_statistics import (
+    CAPABILITY_COLUMNS, ItemStatistics, capability_matrix, deviation_ttest, process_capability,
+)
+
 def check_password():
     """Returns `True` if the user had the correct password."""
 
@@ -178,122 +178,87 @@ def initialize_session_state():
     if 'tab_selection' not in st.session_state:
         st.session_state.tab_selection = "전체 현황"
 
-# 데이터 로드 함수
-@st.cache_data
-def load_sample_data():
-    """샘플 데이터 로드 (openpyxl 사용)"""
+# 데이터 로드 함수 (세션마다 사본을 만들지 않도록 cache_resource로 한 벌만 공유)
+@st.cache_resource(show_spinner=False)
+def load_sample_data(engine=DEFAULT_ENGINE):
+    """샘플 데이터 로드 (engine: 'openpyxl' 또는 'xml')"""
     try:
         # 샘플 데이터 파일 경로
         sample_file = "data/sample_data.xlsx"
-        all_data = {}
-        
-        # openpyxl로 엑셀 파일 열기
-        import openpyxl
-        wb = openpyxl.load_workbook(sample_file)
-        
-        # 모든 시트 처리
-        for sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-            
-            # 데이터 범위 읽기
-            values = list(sheet.values)
-            
-            # 헤더가 있다고 가정하고 데이터프레임 생성
-            if values and len(values) > 1:
-                headers = values[0]
-                data = values[1:]
-                df = pd.DataFrame(data, columns=headers)
-                
-                # 인덱스 컬럼이 없으면 추가
-                if '날짜' not in df.columns:
-                    df = df.reset_index()
-                    df = df.rename(columns={'index': '날짜'})
-                
-                # 숫자 데이터 변환
-                numeric_columns = ['실측', '배합', '상한선', '하한선']
-                for col in numeric_columns:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
-                
-                # 날짜 변환
-                if pd.api.types.is_numeric_dtype(df['날짜']):
-                    df['날짜'] = pd.TimedeltaIndex(df['날짜'], unit='D') + pd.Timestamp('1899-12-30')
-                else:
-                    df['날짜'] = pd.to_datetime(df['날짜'], errors='coerce')
-                
-                # 결측치 처리
-                df = df.dropna(subset=['날짜'])
-                
-                # 시트 이름을 구분으로 추가
-                df['sheet_name'] = sheet_name
-                
-                all_data[sheet_name] = df
-        
-        return all_data
+        return read_workbook_cached(sample_file, engine=engine, workers=INGEST_WORKERS)
     except Exception as e:
         st.error(f"샘플 데이터 로드 중 오류 발생: {str(e)}")
         return None
 
 
 
-def load_uploaded_data(uploaded_file):
-    """업로드된 파일 데이터 로드 (openpyxl 사용)"""
+# 업로드 파일 워크북을 보관할 최대 개수 (가장 오래 사용하지 않은 항목부터 제거)
+UPLOAD_CACHE_MAX_ENTRIES = 8
+
+
+@st.cache_resource(show_spinner=False)
+def _uploaded_sheet_cache():
+    """업로드 파일 간에 공유하는 시트 캐시 (다시 올린 파일에서 바뀌지 않은 시트는 재사용)"""
+    return SheetCache()
+
+
+@st.cache_resource(max_entries=UPLOAD_CACHE_MAX_ENTRIES, show_spinner=False)
+def _open_uploaded_workbook(content_hash, _buffer):
+    """
+    업로드 파일을 지연 로드 워크북으로 엽니다.
+    시트 목록만 먼저 읽고 각 시트는 처음 선택될 때 파싱합니다.
+    캐시 키는 content_hash만 사용하므로 같은 파일은 재실행 시 다시 파싱하지 않습니다.
+    파일 내용이 바뀌어도 시트 XML과 참조 공유 문자열이 같은 시트는 시트 캐시에서 가져옵니다.
+    """
+    # 업로드 버퍼는 streamlit이 관리하므로 캐시에 보관할 사본은 새 파일일 때 한 번만 만듦
+    return LazyWorkbook(bytes(_buffer), sheet_cache=_uploaded_sheet_cache())
+
+
+@st.cache_resource(max_entries=UPLOAD_CACHE_MAX_ENTRIES, show_spinner=False)
+def _read_uploaded_csv(content_hash, file_name, _buffer):
+    """
+    업로드된 CSV/TSV 파일을 청크 단위로 읽어 시트별 데이터프레임으로 만듭니다.
+    시트는 sheet_name 컬럼(없으면 파일 이름)으로 나누며, 엑셀 업로드와 같은 구조를 반환합니다.
+    """
+    return read_csv_workbook(_buffer, file_name)
+
+
+@st.cache_resource(max_entries=UPLOAD_CACHE_MAX_ENTRIES, show_spinner=False)
+def _read_uploaded_files(content_hashes, _uploaded_files):
+    """
+    여러 업로드 파일을 작업 프로세스에서 동시에 파싱하고 시트별로 하나의 카탈로그로 합칩니다.
+    캐시 키는 파일 내용 해시 목록이므로 같은 파일 묶음은 재실행 시 다시 파싱하지 않습니다.
+    """
+    # 작업 프로세스로 넘기려면 bytes 사본이 필요함
+    files = [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in _uploaded_files]
+    return merge_catalog(read_files(files, workers=UPLOAD_WORKERS))
+
+
+def _content_hash(uploaded_file):
+    """업로드 파일 내용의 SHA-256 해시 (업로드 버퍼를 복사하지 않음)"""
+    with uploaded_file.getbuffer() as buffer:
+        return hashlib.sha256(buffer).hexdigest()
+
+
+def load_uploaded_data(uploaded_files):
+    """
+    업로드된 파일 데이터 로드 (파일 내용 해시 기준 캐시)
+    파일이 하나면 엑셀은 시트별 지연 로드, 여러 개면 동시에 파싱해 시트별로 합칩니다.
+    """
     try:
-        # 임시 파일로 저장
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            tmp.write(uploaded_file.getvalue())
-            temp_path = tmp.name
-        
-        all_data = {}
-        
-        # openpyxl로 엑셀 파일 열기
-        import openpyxl
-        wb = openpyxl.load_workbook(temp_path)
-        
-        # 모든 시트 처리
-        for sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-            
-            # 데이터 범위 읽기
-            values = list(sheet.values)
-            
-            # 헤더가 있다고 가정하고 데이터프레임 생성
-            if values and len(values) > 1:
-                headers = values[0]
-                data = values[1:]
-                df = pd.DataFrame(data, columns=headers)
-                
-                # 인덱스 컬럼이 없으면 추가
-                if '날짜' not in df.columns:
-                    df = df.reset_index()
-                    df = df.rename(columns={'index': '날짜'})
-                
-                # 숫자 데이터 변환
-                numeric_columns = ['실측', '배합', '상한선', '하한선']
-                for col in numeric_columns:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
-                
-                # 날짜 변환
-                if pd.api.types.is_numeric_dtype(df['날짜']):
-                    df['날짜'] = pd.TimedeltaIndex(df['날짜'], unit='D') + pd.Timestamp('1899-12-30')
-                else:
-                    df['날짜'] = pd.to_datetime(df['날짜'], errors='coerce')
-                
-                # 결측치 처리
-                df = df.dropna(subset=['날짜'])
-                
-                # 시트 이름을 구분으로 추가
-                df['sheet_name'] = sheet_name
-                
-                all_data[sheet_name] = df
-        
-        # 임시 파일 삭제
-        import os
-        os.unlink(temp_path)
-        
-        return all_data
+        if len(uploaded_files) > 1:
+            content_hashes = tuple(_content_hash(uploaded_file) for uploaded_file in uploaded_files)
+            with st.spinner(f"{len(uploaded_files)}개 파일을 읽는 중..."):
+                return _read_uploaded_files(content_hashes, uploaded_files)
+
+        uploaded_file = uploaded_files[0]
+        # 임시 파일 없이 업로드 버퍼를 memoryview로 바로 사용 (재실행 시 복사 없음)
+        with uploaded_file.getbuffer() as buffer:
+            content_hash = hashlib.sha256(buffer).hexdigest()
+            if is_csv_file(uploaded_file.name):
+                with st.spinner("CSV 파일을 읽는 중..."):
+                    return _read_uploaded_csv(content_hash, uploaded_file.name, buffer)
+            return _open_uploaded_workbook(content_hash, buffer)
     except Exception as e:
         st.error(f"파일 업로드 중 오류 발생: {str(e)}")
         return None
@@ -301,30 +266,237 @@ def load_uploaded_data(uploaded_file):
 
 
 
+def ingest_upload(uploaded_data):
+    """업로드 데이터 중 새로 추가되거나 바뀐 행만 세션 데이터에 합치고 결과를 표시합니다."""
+    try:
+        base = st.session_state.data or {}
+        with st.spinner("변경된 행을 찾는 중..."):
+            merged, summary = merge_workbook(base, uploaded_data)
+    except Exception as e:
+        st.sidebar.error(f"증분 반영 중 오류 발생: {str(e)}")
+        return
+
+    st.session_state.data = merged
+    n_new = int(summary['신규 행 수'].sum())
+    n_changed = int(summary['변경 행 수'].sum())
+    if n_new or n_changed:
+        st.sidebar.success(f"신규 {n_new}행, 변경 {n_changed}행을 반영했습니다.")
+    else:
+        st.sidebar.info("새로 반영할 행이 없습니다.")
+
+
 def calculate_process_capability(data, ucl, lcl, sigma_level=3):
-    mean = data.mean()
-    std = data.std()
-    
-    # 공정능력지수 계산
-    cp = (ucl - lcl) / (6 * std) if std != 0 else float('inf')
-    cpu = (ucl - mean) / (3 * std) if std != 0 else float('inf')
-    cpl = (mean - lcl) / (3 * std) if std != 0 else float('inf')
-    cpk = min(cpu, cpl)
-    
-    # 예상불량률 계산 (ppm 단위)
-    z_upper = (ucl - mean) / std if std != 0 else float('inf')
-    z_lower = (mean - lcl) / std if std != 0 else float('inf')
-    ppm_upper = stats.norm.sf(z_upper) * 1000000
-    ppm_lower = stats.norm.sf(z_lower) * 1000000
-    total_ppm = ppm_upper + ppm_lower
-    
-    return {
-        'Cp': cp,
-        'Cpu': cpu,
-        'Cpl': cpl,
-        'Cpk': cpk,
-        'PPM': total_ppm
-    }
+    # 공정능력지수와 예상불량률(ppm 단위) 계산 (공정능력 현황과 같은 계산식 사용)
+    capability = process_capability(data.mean(), data.std(), ucl, lcl)
+    return {name: float(value) for name, value in capability.items()}
+
+
+# 공정능력 현황 결과를 보관할 최대 개수 (가장 오래 사용하지 않은 항목부터 제거)
+CAPABILITY_CACHE_MAX_ENTRIES = 8
+
+
+@st.cache_resource(max_entries=CAPABILITY_CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_capability_matrix(data_id, _all_data):
+    """
+    모든 제품(시트)과 항목의 공정능력지수를 한 번에 계산합니다 (데이터마다 한 번).
+    캐시 키는 데이터 객체 id이며 (업로드, 증분 반영, 폴더 감시로 데이터가 바뀌면 새 객체),
+    결과에 데이터도 함께 보관하므로 캐시에 있는 동안 id가 재사용되지 않습니다.
+    """
+    return _all_data, capability_matrix(_all_data)
+
+
+@st.cache_resource(max_entries=CAPABILITY_CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_store_capability_matrix(store_version, _store):
+    """
+    이력 저장소의 모든 시트와 항목의 공정능력지수를 한 번에 계산합니다.
+    캐시 키는 저장소 버전이므로 새 행이 반영되기 전까지는 다시 조회하지 않습니다.
+    """
+    return capability_matrix({
+        sheet_name: _store.date_range(sheet_name) for sheet_name in _store.sheet_names()
+    })
+
+# "최근 N개" 표시 범위에서 고를 수 있는 개수
+RECENT_COUNT_PRESETS = [30, 90, 180, 365]
+
+
+def select_display_range():
+    """
+    사이드바에서 데이터 표시 범위를 고릅니다.
+    (표시 범위, 항목별 개수)를 반환하며, 개수는 "최근 N개"일 때만 정해집니다.
+    """
+    display_option = st.sidebar.radio(
+        "데이터 표시 범위",
+        ["최근 N개", "모든 데이터", "날짜 범위 지정"]
+    )
+
+    recent_count = None
+    if display_option == "최근 N개":
+        recent_count = st.sidebar.selectbox(
+            "항목별 최근 데이터 개수",
+            RECENT_COUNT_PRESETS + ["직접 입력"]
+        )
+        if recent_count == "직접 입력":
+            recent_count = st.sidebar.number_input(
+                "개수 입력", min_value=1, value=RECENT_COUNT_PRESETS[0], step=10
+            )
+        recent_count = int(recent_count)
+
+    return display_option, recent_count
+
+
+# 시트 색인을 보관할 최대 개수 (가장 오래 사용하지 않은 항목부터 제거)
+SHEET_INDEX_MAX_ENTRIES = 64
+
+
+@st.cache_resource(max_entries=SHEET_INDEX_MAX_ENTRIES, show_spinner=False)
+def build_sheet_index(frame_id, _df):
+    """
+    시트 데이터의 항목별 색인을 만듭니다 (날짜 내림차순 정렬, 시트 데이터마다 한 번).
+    캐시 키는 데이터프레임 객체 id이며, 색인이 원본(source)을 참조하므로 캐시에 있는 동안 id가 재사용되지 않습니다.
+    """
+    return ItemIndex(_df)
+
+
+def filter_display_range(sheet_index):
+    """사이드바에서 선택한 표시 범위(최근 N개, 모든 데이터, 날짜 범위)로 시트 색인을 거릅니다."""
+    # 데이터 표시 범위 선택
+    display_option, recent_count = select_display_range()
+
+    # 선택한 옵션에 따라 데이터 필터링
+    if display_option == "최근 N개":
+        # 날짜 내림차순 색인에서 항목별 앞쪽 N개 위치만 선택
+        filtered_index = sheet_index.recent(recent_count)
+
+    elif display_option == "모든 데이터":
+        filtered_index = sheet_index
+        
+    else:  # "날짜 범위 지정"
+        # 날짜 범위 선택 (정렬된 날짜 컬럼의 양 끝)
+        date_min, date_max = sheet_index.date_bounds()
+        date_min = date_min.to_pydatetime().date()
+        date_max = date_max.to_pydatetime().date()
+        
+        date_range = st.sidebar.date_input(
+            "날짜 범위 선택",
+            value=(date_min, date_max),
+            min_value=date_min,
+            max_value=date_max
+        )
+        
+        # 날짜 범위가 올바르게 선택되었는지 확인
+        if len(date_range) == 2:
+            start_date, end_date = date_range
+            # 정렬된 날짜 컬럼에서 이진 탐색으로 범위 선택
+            filtered_index = sheet_index.between(start_date, end_date)
+        else:
+            st.warning("날짜 범위를 올바르게 선택해주세요.")
+            filtered_index = sheet_index  # 기본값으로 모든 데이터 사용
+
+    return filtered_index
+
+
+# 항목별 통계 결과를 보관할 최대 개수 (가장 오래 사용하지 않은 항목부터 제거)
+STATISTICS_CACHE_MAX_ENTRIES = 16
+
+
+@st.cache_resource(max_entries=STATISTICS_CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_item_statistics(selected_sheet, index_key, sigma, _item_index):
+    """
+    표시 범위의 항목별 통계를 한 번에 계산합니다.
+    캐시 키는 (시트, 색인 키(데이터와 표시 범위), σ)이므로 같은 조건의 재실행은 다시 계산하지 않습니다.
+    """
+    return ItemStatistics(_item_index.to_frame(), sigma, positions=_item_index.frame_positions())
+
+
+@st.cache_resource(show_spinner=False)
+def open_history_store():
+    """이력 저장소 연결 (모든 세션이 하나를 공유, 형식은 HISTORY_BACKEND 환경 변수로 선택)"""
+    return HISTORY_BACKENDS[HISTORY_BACKEND](HISTORY_DB_PATH)
+
+
+@st.cache_resource(show_spinner=False)
+def start_directory_watcher():
+    """
+    데이터 폴더 감시 스레드를 시작합니다 (모든 세션이 하나를 공유).
+    이력 저장소를 쓰면 감시 스레드가 새 데이터를 저장소에도 반영합니다.
+    """
+    store = open_history_store() if HISTORY_DB_PATH else None
+    watcher = DirectoryWatcher(WATCH_DIR, store=store)
+    watcher.start()
+    return watcher
+
+
+def sync_history_store(store, new_data, upload_id):
+    """
+    데이터를 이력 저장소에 반영합니다 (기존 행은 유지하고 새 행 추가, 바뀐 행 갱신).
+    업로드는 업로드마다 한 번만 반영하고, 업로드가 없으면 저장소가 비어 있을 때만 채웁니다.
+    """
+    if new_data is None:
+        return
+    if upload_id is not None:
+        if st.session_state.get('stored_upload_id') == upload_id:
+            return
+        st.session_state.stored_upload_id = upload_id
+    elif not store.is_empty():
+        return
+
+    try:
+        with st.spinner("이력 저장소에 반영하는 중..."):
+            summary = store.ingest(new_data)
+    except Exception as e:
+        st.sidebar.error(f"이력 저장소 반영 중 오류 발생: {str(e)}")
+        return
+
+    n_new = int(summary['신규 행 수'].sum())
+    n_changed = int(summary['변경 행 수'].sum())
+    if n_new or n_changed:
+        st.sidebar.success(f"이력 저장소: 신규 {n_new}행, 변경 {n_changed}행 저장")
+
+
+def store_display_condition(store, selected_sheet):
+    """
+    filter_display_range와 같은 표시 범위를 이력 저장소 조회 조건 튜플로 반환합니다.
+    ('최근 N개', N), ('모든 데이터',), ('날짜 범위 지정', 시작일, 종료일) 중 하나입니다.
+    """
+    display_option, recent_count = select_display_range()
+
+    if display_option == "최근 N개":
+        return (display_option, recent_count)
+    if display_option == "모든 데이터":
+        return (display_option,)
+
+    # "날짜 범위 지정"
+    date_min, date_max = store.date_bounds(selected_sheet)
+    date_min = date_min.to_pydatetime().date()
+    date_max = date_max.to_pydatetime().date()
+
+    date_range = st.sidebar.date_input(
+        "날짜 범위 선택",
+        value=(date_min, date_max),
+        min_value=date_min,
+        max_value=date_max
+    )
+
+    if len(date_range) == 2:
+        start_date, end_date = date_range
+        return (display_option, start_date, end_date)
+    st.warning("날짜 범위를 올바르게 선택해주세요.")
+    return ("모든 데이터",)
+
+
+@st.cache_resource(max_entries=SHEET_INDEX_MAX_ENTRIES, show_spinner=False)
+def query_display_range(selected_sheet, condition, store_version, _store):
+    """
+    이력 저장소에서 표시 범위만 인덱스로 조회해 항목별 색인을 만듭니다.
+    캐시 키는 (시트, 조회 조건, 저장소 버전)이며 같은 값을 색인 키로 쓰므로,
+    저장소에 새 행이 반영되기 전까지는 재실행해도 조회와 통계 계산을 다시 하지 않습니다.
+    """
+    if condition[0] == "최근 N개":
+        df = _store.recent_per_item(selected_sheet, condition[1])
+    else:
+        df = _store.date_range(selected_sheet, *condition[1:])
+    return ItemIndex(df, key=('저장소', store_version) + condition)
+
 
 def main():
     # 비밀번호 체크
@@ -339,22 +511,50 @@ def main():
     # 사이드바에 파일 업로드 기능 추가
     with st.sidebar:
         st.markdown("### 데이터 업로드")
-        uploaded_file = st.file_uploader("엑셀 파일 업로드 (.xlsx)", type=['xlsx'])
+        uploaded_files = st.file_uploader(
+            "엑셀/CSV 파일 업로드 (.xlsx, .csv, .tsv, 여러 개 선택 가능)",
+            type=['xlsx', 'csv', 'tsv', 'txt'],
+            accept_multiple_files=True
+        )
+        incremental = st.checkbox(
+            "증분 반영 (새로 추가되거나 바뀐 행만 기존 데이터에 합치기)",
+            help="(시트, 날짜, 항목) 기준으로 기존 데이터와 비교합니다."
+        )
         
         # 초기화 버튼
         if st.button("샘플 데이터로 초기화"):
             st.session_state.data = load_sample_data()
+            st.session_state.ingested_upload_id = None
             st.rerun()
     
 # 데이터 로드 로직
     if 'data' not in st.session_state:
         st.session_state.data = load_sample_data()
     
+    # 데이터 폴더를 감시 중이면 백그라운드에서 새로 반영된 데이터로 교체
+    if WATCH_DIR:
+        watcher = start_directory_watcher()
+        watched_version, watched_data = watcher.snapshot()
+        if watched_data and st.session_state.get('watched_version') != watched_version:
+            st.session_state.data = watched_data
+            st.session_state.watched_version = watched_version
+        st.sidebar.caption(f"데이터 폴더 감시 중: {WATCH_DIR} (파일 {watcher.file_count}개 반영)")
+        for path, error in list(watcher.errors.items()):
+            st.sidebar.warning(f"{os.path.basename(path)} 읽기 실패: {error}")
+    
     # 파일이 업로드되면 해당 데이터 사용
-    if uploaded_file is not None:
-        uploaded_data = load_uploaded_data(uploaded_file)
+    uploaded_data = None
+    upload_id = None
+    if uploaded_files:
+        upload_id = tuple(uploaded_file.file_id for uploaded_file in uploaded_files)
+        uploaded_data = load_uploaded_data(uploaded_files)
         if uploaded_data is not None:
-            st.session_state.data = uploaded_data
+            if not incremental:
+                st.session_state.data = uploaded_data
+            elif st.session_state.get('ingested_upload_id') != upload_id:
+                # 같은 업로드는 재실행마다 다시 합치지 않도록 한 번만 반영
+                ingest_upload(uploaded_data)
+                st.session_state.ingested_upload_id = upload_id
     
     all_data = st.session_state.data  # load_data() 대신 세션 상태에서 데이터 가져오기
     
@@ -365,95 +565,65 @@ def main():
     # 사이드바 설정
     st.sidebar.header("필터 설정")
     
+    # 이력 저장소를 쓰면 세션 데이터를 저장소에 반영하고 시트 목록도 저장소에서 가져옴
+    store = open_history_store() if HISTORY_DB_PATH else None
+    if store is not None:
+        sync_history_store(store, all_data if upload_id is None else uploaded_data, upload_id)
+    
     # 시트(제품) 선택
-    sheet_names = list(all_data.keys())
+    sheet_names = store.sheet_names() if store is not None else list(all_data.keys())
     selected_sheet = st.sidebar.selectbox("제품 선택", sheet_names)
     
-    # 선택된 시트의 데이터 가져오기
-    df = all_data[selected_sheet]
-    
-    # 데이터 정렬 및 최근 30개 데이터 기본 선택
-    df = df.sort_values('날짜', ascending=False)
-    
-    # 데이터 표시 개수 선택
-    display_option = st.sidebar.radio(
-        "데이터 표시 범위",
-        ["최근 30개", "최근 90개", "모든 데이터", "날짜 범위 지정"]
-    )
-    
-    # 선택한 옵션에 따라 데이터 필터링
-    if display_option == "최근 30개":
-        # 항목별로 최근 30개 데이터 선택
-        filtered_items = []
-        for item in df['항목'].unique():
-            item_data = df[df['항목'] == item].sort_values('날짜', ascending=False).head(30)
-            filtered_items.append(item_data)
-        
-        filtered_df = pd.concat(filtered_items)
-        date_min = filtered_df['날짜'].min()
-        date_max = filtered_df['날짜'].max()
-        
-    elif display_option == "최근 90개":
-        # 항목별로 최근 90개 데이터 선택
-        filtered_items = []
-        for item in df['항목'].unique():
-            item_data = df[df['항목'] == item].sort_values('날짜', ascending=False).head(90)
-            filtered_items.append(item_data)
-        
-        filtered_df = pd.concat(filtered_items)
-        date_min = filtered_df['날짜'].min()
-        date_max = filtered_df['날짜'].max()
-        
-    elif display_option == "모든 데이터":
-        filtered_df = df
-        date_min = filtered_df['날짜'].min()
-        date_max = filtered_df['날짜'].max()
-        
-    else:  # "날짜 범위 지정"
-        # 날짜 범위 선택
-        date_min = df['날짜'].min().to_pydatetime().date()
-        date_max = df['날짜'].max().to_pydatetime().date()
+    if store is not None:
+        # 이력 저장소에서 표시 범위만 인덱스로 조회
+        condition = store_display_condition(store, selected_sheet)
+        item_index = query_display_range(selected_sheet, condition, store.version, store)
+    else:
+        # 선택된 시트의 데이터 가져오기 (업로드 파일은 처음 선택될 때 파싱)
+        try:
+            df = all_data[selected_sheet]
+        except Exception as e:
+            st.error(f"'{selected_sheet}' 시트 로드 중 오류 발생: {str(e)}")
+            return
         
-        date_range = st.sidebar.date_input(
-            "날짜 범위 선택",
-            value=(date_min, date_max),
-            min_value=date_min,
-            max_value=date_max
-        )
+        if df.empty:
+            st.warning(f"'{selected_sheet}' 시트에 데이터가 없습니다.")
+            return
         
-        # 날짜 범위가 올바르게 선택되었는지 확인
-        if len(date_range) == 2:
-            start_date, end_date = date_range
-            filtered_df = df[
-                (df['날짜'].dt.date >= start_date) &
-                (df['날짜'].dt.date <= end_date)
-            ]
-        else:
-            st.warning("날짜 범위를 올바르게 선택해주세요.")
-            filtered_df = df  # 기본값으로 모든 데이터 사용
+        item_index = filter_display_range(build_sheet_index(id(df), df))
+    
+    filtered_df = item_index.to_frame()
     
     # 이상치 기준 시그마 선택
     sigma = st.sidebar.slider("이상치 기준 (σ)", 1.0, 4.0, 3.0, 0.1)
+    
+    # 항목별 통계는 (시트, 표시 범위, σ)마다 한 번만 계산해 모든 화면에서 사용
+    statistics = compute_item_statistics(selected_sheet, item_index.key, sigma, item_index)
     # 세션 상태 초기화
     initialize_session_state()
 
     # 탭 대신 라디오 버튼으로 화면 전환
     st.markdown('<div style="padding-top: 1rem;"></div>', unsafe_allow_html=True)
-    tab_selection = st.radio("화면 선택", ["전체 현황", "상세 분석"], 
-                            index=0 if st.session_state.tab_selection == "전체 현황" else 1,
+    tab_options = ["전체 현황", "상세 분석", "공정능력 현황"]
+    tab_selection = st.radio("화면 선택", tab_options, 
+                            index=tab_options.index(st.session_state.tab_selection),
                             horizontal=True)
 
     # 라디오 버튼 선택 값을 세션 상태에 저장
     st.session_state.tab_selection = tab_selection
 
     if tab_selection == "전체 현황":
-        display_overview(all_data, filtered_df, selected_sheet, sigma)
+        display_overview(all_data, filtered_df, statistics, selected_sheet, sigma)
+    elif tab_selection == "상세 분석":
+        display_detailed_analysis(filtered_df, statistics, selected_sheet, sigma)
     else:
-        display_detailed_analysis(filtered_df, selected_sheet, sigma)
+        display_capability_matrix(all_data, store)
 
 
 
-def display_detailed_analysis(filtered_df, selected_sheet, sigma):
+def display_detailed_analysis(filtered_df, statistics, selected_sheet, sigma):
+    from scipy import stats
+
     # 조성 항목 선택
     default_selection = []
     if 'selected_item' in st.session_state and st.session_state.selected_item:
@@ -487,102 +657,38 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
         if len(composition_types) == 1:
             # 단일 항목 선택 시
             st.subheader(f"{selected_sheet} 조성 추이 - {composition_types[0]}")
-            item_data = filtered_df[filtered_df['항목'] == composition_types[0]]
-            
-            # 데이터 포인트 인덱스 생성
-            item_data = item_data.sort_values('날짜')
             
-            # 통계적 관리한계 계산
-            mean = item_data['실측'].mean()
-            std = item_data['실측'].std()
-            statistical_ucl = mean + sigma * std
-            statistical_lcl = mean - sigma * std
-            
-            # 정상 및 이상치 포인트 구분
-            normal_points = item_data[abs(item_data['실측'] - mean) <= sigma * std]
-            outlier_points = item_data[abs(item_data['실측'] - mean) > sigma * std]
-            
-            # 부적합 수 계산 (설정 상/하한선을 벗어나는 경우)
-            out_of_spec = item_data[
-                (item_data['실측'] > item_data['상한선']) | 
-                (item_data['실측'] < item_data['하한선'])
-            ]
-            out_of_spec_count = len(out_of_spec)
-            out_of_spec_ratio = out_of_spec_count / len(item_data) * 100 if len(item_data) > 0 else 0
-            
-            # 배합과 실측의 차이 계산 추가
-            item_data['편차'] = item_data['실측'] - item_data['배합']
-            mean_diff = item_data['편차'].mean()
-            std_diff = item_data['편차'].std()
-            abs_mean_diff = item_data['편차'].abs().mean()
+            # 통계 엔진에서 계산한 항목 통계 사용
+            item_stats = statistics.summary.loc[composition_types[0]]
             
             # 주요 통계 위젯 표시 - 카드 형식으로 개선
             st.markdown('<div class="card-container">', unsafe_allow_html=True)
             col1, col2, col3, col4, col5 = st.columns(5)
             with col1:
-                st.metric(label="평균", value=f"{mean:.3f}")
+                st.metric(label="평균", value=f"{item_stats['평균']:.3f}")
             with col2:
-                st.metric(label="표준편차", value=f"{std:.3f}")
+                st.metric(label="표준편차", value=f"{item_stats['표준편차']:.3f}")
             with col3:
-                st.metric(label="이상치 수", value=f"{len(outlier_points)} ({len(outlier_points)/len(item_data)*100:.1f}%)")
+                st.metric(label="이상치 수", value=f"{int(item_stats['이상치 수'])} ({item_stats['이상치 비율(%)']:.1f}%)")
             with col4:
-                st.metric(label="부적합 수 (비율)", value=f"{out_of_spec_count} ({out_of_spec_ratio:.1f}%)")
+                st.metric(label="부적합 수 (비율)", value=f"{int(item_stats['부적합 수'])} ({item_stats['부적합 비율(%)']:.1f}%)")
             with col5:
-                st.metric(label="평균 편차", value=f"{mean_diff:.3f}")
+                st.metric(label="평균 편차", value=f"{item_stats['평균 편차']:.3f}")
             st.markdown('</div>', unsafe_allow_html=True)
             
         else:
             # 다중 항목 선택 시
             st.subheader(f"{selected_sheet} 조성 추이 - 다중 항목")
             
-            # 통계 요약 표시 - 카드 형식으로 개선
-            items_stats = []
-            for item in composition_types:
-                item_data = filtered_df[filtered_df['항목'] == item]
-                item_data = item_data.sort_values('날짜')
-                
-                # 통계치 계산
-                mean = item_data['실측'].mean()
-                std = item_data['실측'].std()
-                
-                # 이상치 수 계산
-                outlier_count = len(item_data[abs(item_data['실측'] - mean) > sigma * std])
-                
-                # 부적합 수 계산 (설정 상/하한선을 벗어나는 경우)
-                out_of_spec = item_data[
-                    (item_data['실측'] > item_data['상한선']) | 
-                    (item_data['실측'] < item_data['하한선'])
-                ]
-                out_of_spec_count = len(out_of_spec)
-                
-                # 배합과 실측의 차이 계산 추가
-                item_data['편차'] = item_data['실측'] - item_data['배합']
-                mean_diff = item_data['편차'].mean()
-                std_diff = item_data['편차'].std()
-                abs_mean_diff = item_data['편차'].abs().mean()
-                
-                # 통계 정보 저장
-                items_stats.append({
-                    '항목': item,
-                    '평균': mean,
-                    '표준편차': std,
-                    '이상치 수': outlier_count,
-                    '이상치 비율(%)': outlier_count/len(item_data)*100 if len(item_data) > 0 else 0,
-                    '부적합 수': out_of_spec_count,
-                    '부적합 비율(%)': out_of_spec_count/len(item_data)*100 if len(item_data) > 0 else 0,
-                    '평균 편차': mean_diff,
-                    '절대 평균 편차': abs_mean_diff
-                })
-            
             # 색상 팔레트 설정
-            colors = px.colors.qualitative.Plotly
+            colors = qualitative.Plotly
             
             # 항목별 카드 컨테이너 시작
             st.markdown('<div class="stats-container" style="margin-top: 20px;">', unsafe_allow_html=True)
             stats_cols = st.columns(len(composition_types))
             for i, item in enumerate(composition_types):
                 with stats_cols[i]:
-                    item_stats = [s for s in items_stats if s['항목'] == item][0]
+                    item_stats = statistics.summary.loc[item]
                     # 카드 스타일 적용
                     st.markdown(f"""
                     <div style="background-color: #f8f9fa; border-radius: 10px; padding: 15px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); border-left: 5px solid {colors[i % len(colors)]};">
@@ -606,24 +712,19 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
         """, unsafe_allow_html=True)
         
         if len(composition_types) == 1:
-            item_data = filtered_df[filtered_df['항목'] == composition_types[0]]
-            item_data = item_data.sort_values('날짜')
+            # 날짜순으로 정렬되고 0부터 인덱스가 매겨진 항목 데이터 (등간격 X축)
+            item_data = statistics[composition_types[0]]
+            item_stats = statistics.summary.loc[composition_types[0]]
             
-            # 통계적 관리한계 계산
-            mean = item_data['실측'].mean()
-            std = item_data['실측'].std()
-            statistical_ucl = mean + sigma * std
-            statistical_lcl = mean - sigma * std
+            # 통계적 관리한계
+            statistical_ucl = item_stats['통계적 상한선']
+            statistical_lcl = item_stats['통계적 하한선']
             
-            # 정상 및 이상치 포인트 구분
-            outlier_points = item_data[abs(item_data['실측'] - mean) > sigma * std]
+            # 이상치 포인트
+            outlier_points = item_data[item_data['이상치']]
             
             fig = go.Figure()
             
-            # 날짜를 등간격으로 표시하기 위한 처리
-            # 날짜를 정렬하고 인덱스 부여
-            item_data = item_data.sort_values('날짜').reset_index(drop=True)
-            
             # 실측값 선과 정상 포인트를 하나의 트레이스로 통합
             fig.add_trace(go.Scatter(
                 x=list(range(len(item_data))),  # 등간격 X축을 위해 인덱스 사용
@@ -642,22 +743,13 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
             
             # 이상치 데이터 포인트
             if not outlier_points.empty:
-                # 이상치 데이터의 인덱스 찾기
-                outlier_indices = []
-                outlier_values = []
-                outlier_dates = []
-                outlier_ids = []
-                
-                for idx, row in item_data.iterrows():
-                    if abs(row['실측'] - mean) > sigma * std:
-                        outlier_indices.append(idx)
-                        outlier_values.append(row['실측'])
-                        outlier_dates.append(row['날짜'].strftime('%Y-%m-%d'))
-                        outlier_ids.append(idx)  # 인덱스 저장
+                # 이상치 데이터의 인덱스 (등간격 X축 위치)
+                outlier_indices = outlier_points.index.tolist()
+                outlier_dates = outlier_points['날짜'].dt.strftime('%Y-%m-%d').tolist()
                 
                 fig.add_trace(go.Scatter(
                     x=outlier_indices,
-                    y=outlier_values,
+                    y=outlier_points['실측'],
                     name='이상치',
                     mode='markers',
                     marker=dict(
@@ -670,7 +762,7 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
                     ),
                     text=outlier_dates,
                     hovertemplate='날짜: %{text}<br>실측: %{y:.3f}<extra></extra>',
-                    customdata=outlier_ids  # 인덱스 정보 저장
+                    customdata=outlier_indices  # 인덱스 정보 저장
                 ))
             
             # 배합값 트레이스
@@ -775,23 +867,15 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
         else:
             # 다중 항목 선택 시
             # 색상 팔레트 설정
-            colors = px.colors.qualitative.Plotly
+            colors = qualitative.Plotly
             
             fig = go.Figure()
             
             # 각 항목별로 그래프 추가
             for i, item in enumerate(composition_types):
                 color = colors[i % len(colors)]
-                item_data = filtered_df[filtered_df['항목'] == item].sort_values('날짜')
-                
-                # 등간격 X축을 위한 인덱스 생성
-                item_data = item_data.reset_index(drop=True)
-                
-                # 통계치 계산
-                mean = item_data['실측'].mean()
-                std = item_data['실측'].std()
-                statistical_ucl = mean + sigma * std
-                statistical_lcl = mean - sigma * std
+                # 날짜순으로 정렬되고 0부터 인덱스가 매겨진 항목 데이터 (등간격 X축)
+                item_data = statistics[item]
                 
                 # 실측값 선과 포인트를 하나의 트레이스로 통합
                 fig.add_trace(go.Scatter(
@@ -900,15 +984,12 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
             # 단일 항목 선택 시 편차 그래프
             # 편차 그래프 생성 부분 수정 (약 1079번째 줄 부근)
             # 단일 항목 선택 시 편차 그래프
-            item_data = filtered_df[filtered_df['항목'] == composition_types[0]]
-            item_data = item_data.sort_values('날짜').reset_index(drop=True)
-
-            # 편차 계산
-            item_data['편차'] = item_data['실측'] - item_data['배합']
+            item_data = statistics[composition_types[0]]
+            item_stats = statistics.summary.loc[composition_types[0]]
 
             # 편차의 통계적 관리한계 계산
-            diff_mean = item_data['편차'].mean()
-            diff_std = item_data['편차'].std()
+            diff_mean = item_stats['평균 편차']
+            diff_std = item_stats['편차 표준편차']
             diff_statistical_ucl = diff_mean + sigma * diff_std
             diff_statistical_lcl = diff_mean - sigma * diff_std
 
@@ -1008,15 +1089,12 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
             diff_fig = go.Figure()
             
             # 색상 팔레트 설정
-            colors = px.colors.qualitative.Plotly
+            colors = qualitative.Plotly
             
             # 각 항목별로 편차 그래프 추가
             for i, item in enumerate(composition_types):
                 color = colors[i % len(colors)]
-                item_data = filtered_df[filtered_df['항목'] == item].sort_values('날짜').reset_index(drop=True)
-                
-                # 편차 계산
-                item_data['편차'] = item_data['실측'] - item_data['배합']
+                item_data = statistics[item]
                 
                 # 편차 선 그래프
                 diff_fig.add_trace(go.Scatter(
@@ -1034,7 +1112,7 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
                 ))
                 
                 # 평균 편차선 추가
-                mean_diff = item_data['편차'].mean()
+                mean_diff = statistics.summary.loc[item, '평균 편차']
                 diff_fig.add_trace(go.Scatter(
                     x=list(range(len(item_data))),
                     y=[mean_diff] * len(item_data),
@@ -1100,7 +1178,7 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
     
     with anomaly_container:
         if len(composition_types) == 1:
-            item_data = filtered_df[filtered_df['항목'] == composition_types[0]]
+            item_data = statistics[composition_types[0]]
             item_name = composition_types[0]
             
             # 이상치 정보 표시
@@ -1111,16 +1189,13 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
             """, unsafe_allow_html=True)
             
             # 이상치 테이블 생성
-            mean = item_data['실측'].mean()
-            std = item_data['실측'].std()
-            outlier_points = item_data[abs(item_data['실측'] - mean) > sigma * std]
+            outlier_points = item_data[item_data['이상치']]
             
             if not outlier_points.empty:
                 # 이상치 정보 테이블 생성
                 outlier_table = outlier_points.copy()
                 outlier_table = outlier_table.sort_values('날짜', ascending=False)
                 outlier_table['날짜'] = outlier_table['날짜'].dt.strftime('%Y년 %m월 %d일')
-                outlier_table['편차'] = outlier_table['실측'] - outlier_table['배합']
                 
                 # 필요한 열만 선택하고 이름 변경
                 outlier_display = outlier_table[['날짜', '실측', '배합', '편차']].reset_index(drop=True)
@@ -1138,17 +1213,13 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
             """, unsafe_allow_html=True)
             
             # 부적합 테이블 생성
-            out_of_spec = item_data[
-                (item_data['실측'] > item_data['상한선']) | 
-                (item_data['실측'] < item_data['하한선'])
-            ]
+            out_of_spec = item_data[item_data['부적합']]
             
             if not out_of_spec.empty:
                 # 부적합 정보 테이블 생성
                 oos_table = out_of_spec.copy()
                 oos_table = oos_table.sort_values('날짜', ascending=False)
                 oos_table['날짜'] = oos_table['날짜'].dt.strftime('%Y년 %m월 %d일')
-                oos_table['편차'] = oos_table['실측'] - oos_table['배합']
                 
                 # 필요한 열만 선택하고 이름 변경
                 oos_display = oos_table[['날짜', '실측', '배합', '편차']].reset_index(drop=True)
@@ -1164,7 +1235,7 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
             
             for i, (tab, item) in enumerate(zip(tabs, composition_types)):
                 with tab:
-                    item_data = filtered_df[filtered_df['항목'] == item]
+                    item_data = statistics[item]
                     
                     # 이상치 정보 표시
                     st.markdown(f"""
@@ -1174,16 +1245,13 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
                     """, unsafe_allow_html=True)
                     
                     # 이상치 테이블 생성
-                    mean = item_data['실측'].mean()
-                    std = item_data['실측'].std()
-                    outlier_points = item_data[abs(item_data['실측'] - mean) > sigma * std]
+                    outlier_points = item_data[item_data['이상치']]
                     
                     if not outlier_points.empty:
                         # 이상치 정보 테이블 생성
                         outlier_table = outlier_points.copy()
                         outlier_table = outlier_table.sort_values('날짜', ascending=False)
                         outlier_table['날짜'] = outlier_table['날짜'].dt.strftime('%Y년 %m월 %d일')
-                        outlier_table['편차'] = outlier_table['실측'] - outlier_table['배합']
                         
                         # 필요한 열만 선택하고 이름 변경
                         outlier_display = outlier_table[['날짜', '실측', '배합', '편차']].reset_index(drop=True)
@@ -1201,17 +1269,13 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
                     """, unsafe_allow_html=True)
                     
                     # 부적합 테이블 생성
-                    out_of_spec = item_data[
-                        (item_data['실측'] > item_data['상한선']) | 
-                        (item_data['실측'] < item_data['하한선'])
-                    ]
+                    out_of_spec = item_data[item_data['부적합']]
                     
                     if not out_of_spec.empty:
                         # 부적합 정보 테이블 생성
                         oos_table = out_of_spec.copy()
                         oos_table = oos_table.sort_values('날짜', ascending=False)
                         oos_table['날짜'] = oos_table['날짜'].dt.strftime('%Y년 %m월 %d일')
-                        oos_table['편차'] = oos_table['실측'] - oos_table['배합']
                         
                         # 필요한 열만 선택하고 이름 변경
                         oos_display = oos_table[['날짜', '실측', '배합', '편차']].reset_index(drop=True)
@@ -1233,13 +1297,14 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
             </div>
             """, unsafe_allow_html=True)
           
-            item_data = filtered_df[filtered_df['항목'] == composition_types[0]]
+            item_data = statistics[composition_types[0]]
             item = composition_types[0]
+            item_stats = statistics.summary.loc[item]
           
             # 공정능력지수 계산
             if '상한선' in item_data.columns and '하한선' in item_data.columns:
-                ucl = item_data['상한선'].mean()
-                lcl = item_data['하한선'].mean()
+                ucl = item_stats['상한선']
+                lcl = item_stats['하한선']
               
                 process_capability = calculate_process_capability(item_data['실측'], ucl, lcl, sigma)
               
@@ -1285,8 +1350,8 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
                 ))
               
                 # 정규분포 곡선 추가
-                mean = item_data['실측'].mean()
-                std = item_data['실측'].std()
+                mean = item_stats['평균']
+                std = item_stats['표준편차']
                 x_range = np.linspace(hist_data.min() - 0.5, hist_data.max() + 0.5, 100)
                 y_range = stats.norm.pdf(x_range, mean, std)
               
@@ -1300,7 +1365,7 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
               
                 # 관리한계선 추가
                 if '상한선' in item_data.columns:
-                    ucl = item_data['상한선'].mean()
+                    ucl = item_stats['상한선']
                     hist_fig.add_trace(go.Scatter(
                         x=[ucl, ucl],
                         y=[0, stats.norm.pdf(mean, mean, std) * 1.2],
@@ -1310,7 +1375,7 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
                     ))
               
                 if '하한선' in item_data.columns:
-                    lcl = item_data['하한선'].mean()
+                    lcl = item_stats['하한선']
                     hist_fig.add_trace(go.Scatter(
                         x=[lcl, lcl],
                         y=[0, stats.norm.pdf(mean, mean, std) * 1.2],
@@ -1320,8 +1385,8 @@ def display_detailed_analysis(filtered_df, selected_sheet, sigma):
                     ))
               
                 # 통계적 관리한계선 추가
-                statistical_ucl = mean + sigma * std
-                statistical_lcl = mean - sigma * std
+                statistical_ucl = item_stats['통계적 상한선']
+                statistical_lcl = item_stats['통계적 하한선']
               
                 hist_fig.add_trace(go.Scatter(
                     x=[statistical_ucl, statistical_ucl],
@@ -1406,10 +1471,12 @@ def plotly_chart_with_click_event(fig, key=None):
 
 
 
-def display_overview(all_data, filtered_df, selected_sheet, sigma):
+def display_overview(all_data, filtered_df, statistics, selected_sheet, sigma):
     """
     전체 현황을 표시하는 함수
     """
+    import plotly.express as px
+
     st.subheader(f"{selected_sheet} 조성 전체 현황")
     
     # 전체 항목 가져오기
@@ -1422,50 +1489,8 @@ def display_overview(all_data, filtered_df, selected_sheet, sigma):
     </div>
     """, unsafe_allow_html=True)
     
-    # 각 항목별 배합-실측 차이 계산
-    diff_stats = []
-    
-    for item in all_items:
-        item_data = filtered_df[filtered_df['항목'] == item]
-        
-        # 편차 계산
-        item_data['편차'] = item_data['실측'] - item_data['배합']
-        
-        # 통계치 계산
-        mean_diff = item_data['편차'].mean()
-        std_diff = item_data['편차'].std()
-        
-        # t-검정으로 통계적 유의성 확인
-        t_stat, p_value = stats.ttest_1samp(item_data['편차'], 0)
-        
-        # 통계적 판단 (p < 0.05이면 통계적으로 유의한 차이)
-        if p_value < 0.05:
-            if mean_diff > 0:
-                statistical_judgment = "실측값이 배합값보다 통계적으로 유의하게 높음"
-                color = "red"
-                technical_judgment = "배합 설정값이 실제 투입량보다 낮게 설정되어 있거나, 측정 과정에서 양의 편향 가능성"
-            else:
-                statistical_judgment = "실측값이 배합값보다 통계적으로 유의하게 낮음"
-                color = "blue"
-                technical_judgment = "공정 중 원료 손실 가능성 또는 원료 투입량이 설정값보다 적을 가능성"
-        else:
-            statistical_judgment = "실측값과 배합값 사이에 통계적으로 유의한 차이 없음"
-            color = "green"
-            technical_judgment = "배합과 실측이 잘 일치함"
-        
-        # 결과 저장
-        diff_stats.append({
-            '항목': item,
-            '평균_편차': mean_diff,
-            '편차_표준편차': std_diff,
-            'p값': p_value,
-            '통계적_판단': statistical_judgment,
-            '기술적_판단': technical_judgment,
-            '색상': color
-        })
-    
-    # 데이터프레임으로 변환
-    diff_stats_df = pd.DataFrame(diff_stats)
+    # 모든 항목의 배합-실측 차이 t-검정 (한 번에 계산)
+    diff_stats_df = deviation_ttest(statistics.summary)
     
     # 통계적으로 유의한 차이가 있는 항목 필터링
     higher_items = diff_stats_df[(diff_stats_df['p값'] < 0.05) & (diff_stats_df['평균_편차'] > 0)]
@@ -1584,64 +1609,10 @@ def display_overview(all_data, filtered_df, selected_sheet, sigma):
     </div>
     """, unsafe_allow_html=True)
     
-    # 모든 항목의 이상치 및 부적합 계산 (이하 기존 코드)
-    anomaly_data = []
-
+    # 모든 항목의 이상치 및 부적합 표 (통계 엔진의 마스크로 한 번에 생성, 날짜 내림차순)
+    anomaly_df = statistics.anomalies()
     
-    for item in all_items:
-        item_data = filtered_df[filtered_df['항목'] == item]
-        
-        # 통계치 계산
-        mean = item_data['실측'].mean()
-        std = item_data['실측'].std()
-        
-        # 이상치 계산
-        outliers = item_data[abs(item_data['실측'] - mean) > sigma * std]
-        
-        # 부적합 계산
-        out_of_spec = item_data[
-            (item_data['실측'] > item_data['상한선']) | 
-            (item_data['실측'] < item_data['하한선'])
-        ]
-       # 이상치 데이터 저장
-        for _, row in outliers.iterrows():
-            anomaly_data.append({
-                '항목': item,
-                '날짜': row['날짜'],
-                '실측값': row['실측'],
-                '배합값': row['배합'],
-                '편차': row['실측'] - row['배합'],
-                '평균': mean,
-                '표준편차': std,
-                '상한선': row['상한선'],
-                '하한선': row['하한선'],
-                '유형': '이상치',
-                '비고': f"{abs(row['실측'] - mean) / std:.2f}σ 이탈"
-            })
-        
-        # 부적합 데이터 저장 (이상치가 아닌 경우만)
-        for _, row in out_of_spec.iterrows():
-            if abs(row['실측'] - mean) <= sigma * std:  # 이상치가 아닌 경우만 추가
-                anomaly_data.append({
-                    '항목': item,
-                    '날짜': row['날짜'],
-                    '실측값': row['실측'],
-                    '배합값': row['배합'],
-                    '편차': row['실측'] - row['배합'],
-                    '평균': mean,
-                    '표준편차': std,
-                    '상한선': row['상한선'],
-                    '하한선': row['하한선'],
-                    '유형': '부적합',
-                    '비고': '규격 이탈'
-                })
-    
-    # 데이터프레임으로 변환
-    if anomaly_data:
-        anomaly_df = pd.DataFrame(anomaly_data)
-        anomaly_df['날짜'] = pd.to_datetime(anomaly_df['날짜'])
-        anomaly_df = anomaly_df.sort_values('날짜', ascending=False)
-        
+    if not anomaly_df.empty:
         # 요약 통계 표시
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -1734,8 +1705,9 @@ def display_overview(all_data, filtered_df, selected_sheet, sigma):
         
         # 선택 가능한 데이터 목록 생성
         selection_data = anomaly_df[['항목', '날짜', '실측값', '유형']].copy()
-        selection_data['표시'] = selection_data.apply(
-            lambda row: f"{row['항목']} - {row['날짜']} ({row['유형']})", axis=1
+        selection_data['표시'] = (
+            selection_data['항목'].astype(str) + ' - ' + selection_data['날짜'].astype(str)
+            + ' (' + selection_data['유형'].astype(str) + ')'
         )
         
         # 선택 위젯
@@ -1761,6 +1733,77 @@ def display_overview(all_data, filtered_df, selected_sheet, sigma):
 
 
         
+def display_capability_matrix(all_data, store=None):
+    """
+    전 제품 공정능력 현황을 표시하는 함수 (모든 시트, 모든 항목의 Cp/Cpk/PPM 표와 히트맵)
+    이력 저장소를 쓰면 다른 화면과 같이 저장소의 전체 이력으로 계산
+    """
+    st.subheader("전 제품 공정능력 현황")
+    
+    with st.spinner("공정능력지수를 계산하는 중..."):
+        if store is not None:
+            matrix = compute_store_capability_matrix(store.version, store)
+        else:
+            _, matrix = compute_capability_matrix(id(all_data), all_data)
+    
+    if matrix.empty:
+        st.info("공정능력지수를 계산할 데이터가 없습니다.")
+        return
+    
+    # 히트맵에 표시할 지수 선택
+    index_name = st.selectbox("히트맵 지표", ['Cpk', 'Cp', 'Cpu', 'Cpl'])
+    
+    # 요약 (규격 한계가 있는 항목 기준)
+    valid = matrix[np.isfinite(matrix['Cpk'])]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(label="제품 수", value=matrix['시트'].nunique())
+    with col2:
+        st.metric(label="Cpk 1.33 미만 항목", value=int((valid['Cpk'] < 1.33).sum()))
+    with col3:
+        st.metric(label="Cpk 1.0 미만 항목", value=int((valid['Cpk'] < 1.0).sum()))
+    
+    # 제품 x 항목 히트맵 (무한대/없는 값은 빈 칸)
+    heatmap = matrix.pivot(index='시트', columns='항목', values=index_name)
+    heatmap = heatmap.reindex(index=matrix['시트'].unique(), columns=matrix['항목'].unique())
+    z = heatmap.to_numpy(dtype=float)
+    z = np.where(np.isfinite(z), z, np.nan)
+    
+    fig = go.Figure(go.Heatmap(
+        z=z,
+        x=heatmap.columns.tolist(),
+        y=heatmap.index.tolist(),
+        colorscale='RdYlGn',
+        zmin=0,
+        zmax=2,
+        text=np.where(np.isnan(z), '', np.char.mod('%.2f', np.nan_to_num(z))),
+        texttemplate='%{text}',
+        hovertemplate='제품: %{y}<br>항목: %{x}<br>' + index_name + ': %{z:.3f}<extra></extra>',
+        colorbar=dict(title=index_name)
+    ))
+    fig.update_layout(
+        xaxis_title='항목',
+        yaxis_title='제품',
+        yaxis=dict(autorange='reversed'),
+        height=max(400, 35 * len(heatmap.index) + 150),
+        margin=dict(l=40, r=40, t=40, b=80)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # 전체 표 (Cpk 낮은 순)
+    st.subheader("제품/항목별 공정능력지수")
+    st.dataframe(
+        matrix.sort_values('Cpk', kind='stable'),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            **{col: st.column_config.NumberColumn(col, format="%.3f")
+               for col in ['평균', '표준편차', '상한선', '하한선'] + CAPABILITY_COLUMNS},
+            'PPM': st.column_config.NumberColumn('PPM', format="%.2f"),
+        }
+    )
+
+
 def register_click_callback():
     """
     클릭 이벤트 콜백을 등록하는 함수
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+엑셀 읽기 엔진 벤치마크
+
+사용법:
+    python benchmark.py [엑셀 파일 경로] [--repeat N] [--workers N ...] [--startup-budget 초]
+"""
+
+import argparse
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+import pandas as pd
+
+import data_loader
+import history_store
+import item_statistics
+
+
+def time_call(func, repeat):
+    """func를 repeat번 실행하여 (최소 시간, 마지막 결과)를 반환합니다."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def assert_same_data(expected, actual):
+    """두 엔진의 결과가 같은 시트와 같은 값을 갖는지 확인합니다."""
+    assert list(expected) == list(actual), "시트 목록이 다릅니다"
+    for sheet_name in expected:
+        pd.testing.assert_frame_equal(
+            expected[sheet_name], actual[sheet_name], check_dtype=False
+        )
+
+
+# app.py 가져오기(import) 시간 허용 한도 (초)
+STARTUP_BUDGET_SECONDS = 2.0
+
+
+def benchmark_startup(repeat, budget):
+    """
+    새 파이썬 프로세스에서 app.py를 가져오는 시간을 측정합니다.
+    서버 시작과 스크립트 재실행 때마다 드는 시간이므로, 한도(budget초)를 넘으면 False를 반환합니다.
+    """
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    code = "import time; start = time.perf_counter(); import app; print(time.perf_counter() - start)"
+    best = float('inf')
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=app_dir,
+            capture_output=True, text=True, check=True,
+        )
+        best = min(best, float(result.stdout.split()[-1]))
+
+    passed = best <= budget
+    print("시작 시간 (app.py 가져오기)")
+    print(f"  {best * 1000:8.1f} ms  (한도 {budget * 1000:.0f} ms, {'통과' if passed else '초과'})")
+    return passed
+
+
+def benchmark_engines(path, repeat):
+    """엔진별 read_workbook 시간을 측정하고 openpyxl 대비 속도 향상을 출력합니다."""
+    print(f"파일: {path} (반복 {repeat}회, 최소 시간 기준)")
+
+    results = {}
+    for engine in data_loader.WORKBOOK_ENGINES:
+        elapsed, data = time_call(lambda: data_loader.read_workbook(path, engine=engine), repeat)
+        results[engine] = (elapsed, data)
+
+    baseline, baseline_data = results['openpyxl']
+    for engine, (elapsed, data) in results.items():
+        assert_same_data(baseline_data, data)
+        rows = sum(len(df) for df in data.values())
+        print(f"  {engine:<10} {elapsed * 1000:8.1f} ms  "
+              f"({len(data)}개 시트, {rows}행)  x{baseline / elapsed:.2f}")
+
+    fastest = min(results, key=lambda engine: results[engine][0])
+    print(f"  가장 빠른 엔진: {fastest} (WORKBOOK_ENGINE={fastest}로 지정)")
+
+    # 숫자 컬럼 중 텍스트로 저장되어 문자열 파싱이 필요했던 셀 수
+    report = data_loader.numeric_fallback_report(baseline_data)
+    print(f"  텍스트 변환 셀: {report['텍스트 변환 셀 수'].sum()} / {report['값 있는 셀 수'].sum()}")
+
+
+def benchmark_sidecar_cache(path, repeat):
+    """Parquet 디스크 캐시가 없을 때와 있을 때의 read_workbook_cached 시간을 비교합니다."""
+    cache_dir = tempfile.mkdtemp(prefix='workbook-cache-')
+    try:
+        cold, data = time_call(lambda: data_loader.read_workbook_cached(path, cache_dir=cache_dir), 1)
+        warm, cached = time_call(lambda: data_loader.read_workbook_cached(path, cache_dir=cache_dir), repeat)
+        assert_same_data(data, cached)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print("디스크 캐시")
+    print(f"  캐시 없음   {cold * 1000:8.1f} ms")
+    print(f"  캐시 사용   {warm * 1000:8.1f} ms  x{cold / warm:.2f}")
+
+
+def benchmark_workers(path, repeat, workers):
+    """작업 프로세스 수에 따른 read_workbook 시간을 비교합니다."""
+    print(f"병렬 파싱 (CPU {os.cpu_count()}개)")
+
+    baseline = None
+    baseline_data = None
+    for n in sorted(set([1] + workers)):
+        elapsed, data = time_call(
+            lambda: data_loader.read_workbook(path, workers=n), repeat
+        )
+        if baseline is None:
+            baseline, baseline_data = elapsed, data
+        assert_same_data(baseline_data, data)
+        print(f"  작업 {n:>2}개   {elapsed * 1000:8.1f} ms  x{baseline / elapsed:.2f}")
+
+
+def _copy_with_changed_sheet(path):
+    """첫 번째 시트의 마지막 공유 문자열 셀 하나만 바꾼 워크북 사본(bytes)을 만듭니다."""
+    with zipfile.ZipFile(path) as src:
+        sheets, _, _ = data_loader._read_workbook_parts(src)
+        first_part = sheets[0][1]
+
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                data = src.read(info.filename)
+                if info.filename == first_part:
+                    *_, last = re.finditer(rb't="s"[^>]*><v>(\d+)</v>', data)
+                    changed = str(int(last.group(1)) + 1).encode()
+                    data = data[:last.start(1)] + changed + data[last.end(1):]
+                dst.writestr(info, data)
+    return out.getvalue()
+
+
+def benchmark_sheet_reuse(path, repeat):
+    """시트 하나만 바뀐 워크북을 다시 올렸을 때 시트 캐시 재사용 효과를 측정합니다."""
+    with open(path, 'rb') as f:
+        original = f.read()
+    changed = _copy_with_changed_sheet(path)
+
+    def load_all(content, sheet_cache):
+        workbook = data_loader.LazyWorkbook(content, sheet_cache=sheet_cache)
+        return workbook, {sheet_name: workbook[sheet_name] for sheet_name in workbook}
+
+    cold, (_, expected) = time_call(lambda: load_all(changed, None), repeat)
+
+    def reupload():
+        sheet_cache = data_loader.SheetCache()
+        load_all(original, sheet_cache)
+        start = time.perf_counter()
+        result = load_all(changed, sheet_cache)
+        return time.perf_counter() - start, result
+
+    warm = float('inf')
+    for _ in range(repeat):
+        elapsed, (workbook, data) = reupload()
+        warm = min(warm, elapsed)
+    assert_same_data(expected, data)
+    reused = sum(workbook.is_reused(sheet_name) for sheet_name in workbook)
+
+    print("시트 단위 재사용 (첫 시트만 변경)")
+    print(f"  전체 파싱   {cold * 1000:8.1f} ms")
+    print(f"  재업로드    {warm * 1000:8.1f} ms  x{cold / warm:.2f}  "
+          f"({reused}/{len(workbook)}개 시트 재사용)")
+
+
+def benchmark_history_store(path, repeat):
+    """이력 저장소 형식별 반영 시간과 표시 범위 조회 시간을 측정합니다."""
+    data = data_loader.read_workbook(path)
+    # 각 시트의 마지막 달 한 달치 범위
+    windows = {
+        sheet_name: (df['날짜'].max().replace(day=1).date(), df['날짜'].max().date())
+        for sheet_name, df in data.items()
+    }
+
+    for backend, store_class in history_store.HISTORY_BACKENDS.items():
+        store_dir = tempfile.mkdtemp(prefix='history-store-')
+        try:
+            store = store_class(os.path.join(store_dir, 'history'))
+            ingest, _ = time_call(lambda: store.ingest(data), 1)
+            reingest, summary = time_call(lambda: store.ingest(data), 1)
+            assert summary['신규 행 수'].sum() == 0 and summary['변경 행 수'].sum() == 0
+
+            sheet_names = store.sheet_names()
+            recent, _ = time_call(lambda: [store.recent_per_item(s, 30) for s in sheet_names], repeat)
+            everything, _ = time_call(lambda: [store.date_range(s) for s in sheet_names], repeat)
+            month, _ = time_call(lambda: [store.date_range(s, *windows[s]) for s in sheet_names], repeat)
+            store.close()
+        finally:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+        print(f"이력 저장소 {backend} ({len(sheet_names)}개 시트)")
+        print(f"  최초 반영    {ingest * 1000:8.1f} ms")
+        print(f"  재반영       {reingest * 1000:8.1f} ms")
+        print(f"  최근 30개    {recent * 1000:8.1f} ms")
+        print(f"  모든 데이터  {everything * 1000:8.1f} ms")
+        print(f"  최근 한 달   {month * 1000:8.1f} ms")
+
+
+def benchmark_csv(path, repeat):
+    """같은 데이터를 CSV로 내보내 엑셀 읽기와 청크 단위 CSV 읽기 시간, 최대 메모리를 비교합니다."""
+    data = data_loader.read_workbook(path)
+    csv_dir = tempfile.mkdtemp(prefix='csv-ingest-')
+    try:
+        csv_path = os.path.join(csv_dir, 'export.csv')
+        pd.concat(data.values(), ignore_index=True).to_csv(csv_path, index=False)
+
+        excel, _ = time_call(lambda: data_loader.read_workbook(path), repeat)
+        csv, csv_data = time_call(lambda: data_loader.read_csv_workbook(csv_path, csv_path), repeat)
+        assert_same_data({k: df.reset_index(drop=True) for k, df in data.items()}, csv_data)
+
+        tracemalloc.start()
+        data_loader.read_csv_workbook(csv_path, csv_path, chunksize=2000)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = os.path.getsize(csv_path)
+    finally:
+        shutil.rmtree(csv_dir, ignore_errors=True)
+
+    print(f"CSV 읽기 ({size / 1024:.0f} KB)")
+    print(f"  엑셀        {excel * 1000:8.1f} ms")
+    print(f"  CSV         {csv * 1000:8.1f} ms  x{excel / csv:.2f}")
+    print(f"  최대 메모리 (2000행 청크) {peak / 1024:8.1f} KB")
+
+
+def benchmark_statistics(path, repeat, sigma=2.0):
+    """
+    시트별 최근 30개 범위로 ItemStatistics 계산 시간을 측정합니다.
+    값이 모두 같은 항목에서 이상치가 나오지 않는지도 함께 확인합니다.
+    """
+    data = data_loader.read_workbook(path)
+    views = {
+        sheet_name: data_loader.ItemIndex(df).recent(30).to_frame()
+        for sheet_name, df in data.items()
+    }
+    elapsed, results = time_call(
+        lambda: {s: item_statistics.ItemStatistics(df, sigma) for s, df in views.items()}, repeat
+    )
+
+    constant = pd.DataFrame({
+        '항목': ['상수'] * 30, '날짜': pd.date_range('2024-01-01', periods=30),
+        '배합': 0.03, '실측': 0.03, '상한선': 0.04, '하한선': 0.02,
+    })
+    constant_stats = item_statistics.ItemStatistics(constant, sigma)
+    assert constant_stats.summary.loc['상수', '이상치 수'] == 0, "상수 항목에서 이상치가 판정되었습니다"
+    assert constant_stats.anomalies().empty, "상수 항목이 이상치 표에 나타났습니다"
+    for sheet_name, df in views.items():
+        summary = results[sheet_name].summary
+        flat = df.groupby('항목', observed=True)['실측'].nunique() == 1
+        assert (summary.loc[flat[flat].index, '이상치 수'] == 0).all(), f"{sheet_name}: 상수 항목 이상치"
+
+    rows = sum(len(df) for df in views.values())
+    print(f"항목별 통계 (최근 30개, {len(views)}개 시트, {rows}행)")
+    print(f"  ItemStatistics {elapsed * 1000:8.1f} ms")
+
+
+def report_memory(path):
+    """시트별 메모리 사용량을 기존 레이아웃(문자열 object, float64)과 비교해 출력합니다."""
+    data = data_loader.read_workbook(path)
+    compact = data_loader.memory_report(data)
+    plain = data_loader.memory_report({
+        sheet_name: df.astype({
+            col: object for col in data_loader.CATEGORICAL_COLUMNS if col in df.columns
+        }).astype({
+            col: 'float64' for col in data_loader.NUMERIC_COLUMNS if col in df.columns
+        })
+        for sheet_name, df in data.items()
+    })
+
+    print(f"메모리 사용량 (측정값 자료형 {data_loader.MEASUREMENT_DTYPE})")
+    for (_, row), plain_kb in zip(compact.iterrows(), plain['메모리(KB)']):
+        print(f"  {row['sheet_name']:<14} {row['행 수']:>6}행  "
+              f"{plain_kb:8.1f} KB -> {row['메모리(KB)']:8.1f} KB")
+    print(f"  합계                          "
+          f"{plain['메모리(KB)'].sum():8.1f} KB -> {compact['메모리(KB)'].sum():8.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엑셀 읽기 엔진 벤치마크")
+    parser.add_argument('path', nargs='?', default='data/sample_data.xlsx')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='*', default=[2, 4])
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_SECONDS)
+    args = parser.parse_args()
+
+    startup_ok = benchmark_startup(args.repeat, args.startup_budget)
+    benchmark_engines(args.path, args.repeat)
+    report_memory(args.path)
+    benchmark_sidecar_cache(args.path, args.repeat)
+    benchmark_sheet_reuse(args.path, args.repeat)
+    benchmark_history_store(args.path, args.repeat)
+    benchmark_csv(args.path, args.repeat)
+    benchmark_statistics(args.path, args.repeat)
+    benchmark_workers(args.path, args.repeat, args.workers)
+
+    if not startup_ok:
+        sys.exit("시작 시간이 한도를 넘었습니다")
+
+
+if __name__ == "__main__":
+    main()
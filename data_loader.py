@@ -0,0 +1,1303 @@
+# -*- coding: utf-8 -*-
+"""
+엑셀 데이터 로드 모듈
+
+엑셀 파일을 시트별 데이터프레임으로 읽고 정규화합니다.
+streamlit에 의존하지 않으므로 작업 프로세스와 벤치마크에서도 가져올 수 있습니다.
+"""
+
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import io
+import itertools
+import json
+import os
+import platform
+import posixpath
+import re
+import shutil
+import tempfile
+import threading
+import warnings
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# openpyxl, xlwings는 해당 엔진으로 처음 읽을 때 가져옴 (시작 시간 단축)
+# xlwings는 엑셀 프로그램이 설치된 Windows/macOS에서만 사용 (그 외 환경에서는 엔진 목록에서 제외)
+XLWINGS_AVAILABLE = (
+    platform.system() in ('Windows', 'Darwin') and importlib.util.find_spec('xlwings') is not None
+)
+
+
+# 숫자로 변환할 컬럼
+NUMERIC_COLUMNS = ['실측', '배합', '상한선', '하한선']
+
+# 행마다 반복되는 문자열 컬럼 (범주형으로 저장)
+CATEGORICAL_COLUMNS = ['sheet_name', '구분', '항목']
+
+# 측정값 컬럼 자료형 (환경 변수 MEASUREMENT_DTYPE=float32로 지정하면 메모리 절반)
+MEASUREMENT_DTYPE = np.dtype(os.environ.get('MEASUREMENT_DTYPE', 'float64'))
+
+
+def _read_sheet_columns(sheet):
+    """
+    읽기 전용 시트를 행 단위로 스트리밍하여 미리 할당한 컬럼 배열에 채웁니다.
+    헤더와 데이터 행이 모두 있으면 (headers, columns)를, 없으면 None을 반환합니다.
+    """
+    rows = sheet.iter_rows(values_only=True)
+    headers = next(rows, None)
+    if not headers:
+        return None
+
+    n_cols = len(headers)
+    # dimension 정보로 배열 크기를 미리 잡고, 부정확하면 두 배씩 늘림
+    capacity = max((sheet.max_row or 1) - 1, 0)
+    columns = [np.empty(capacity, dtype=object) for _ in range(n_cols)]
+
+    n_rows = 0
+    for row in rows:
+        if n_rows >= capacity:
+            capacity = max(capacity * 2, 1024)
+            columns = [
+                np.concatenate([col, np.empty(capacity - len(col), dtype=object)])
+                for col in columns
+            ]
+        for j, value in enumerate(row[:n_cols]):
+            columns[j][n_rows] = value
+        n_rows += 1
+
+    if n_rows == 0:
+        return None
+
+    return headers, [col[:n_rows] for col in columns]
+
+
+def _parse_numeric_text(texts):
+    """텍스트 배열에서 쉼표를 제거하고 숫자로 파싱합니다 (고유값별로 한 번만 파싱)."""
+    codes, uniques = pd.factorize(texts)
+    cleaned = pd.Series(uniques, dtype=object).str.replace(',', '', regex=False)
+    parsed = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=np.float64)
+    return parsed[codes]
+
+
+def _coerce_numeric(series):
+    """
+    숫자 컬럼을 float64로 변환합니다.
+    숫자 셀은 그대로 사용하고, 텍스트 셀만 쉼표 제거 후 파싱합니다 (그 외 값은 NaN).
+    (변환된 Series, 텍스트 파싱이 필요했던 셀 수)를 반환합니다.
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return pd.Series(np.nan, index=series.index, name=series.name), 0
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(np.float64), 0
+
+    values = series.to_numpy(dtype=object)
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+
+    if inferred in ('integer', 'floating', 'mixed-integer-float', 'empty'):
+        # 숫자 셀과 빈 셀만 있음
+        result = pd.to_numeric(values, errors='coerce').astype(np.float64)
+        return pd.Series(result, index=series.index, name=series.name), 0
+
+    result = np.full(len(values), np.nan)
+    if inferred == 'string':
+        # 빈 셀을 제외하면 모두 텍스트
+        is_text = pd.notna(values)
+    else:
+        # 숫자/텍스트/기타 값이 섞인 컬럼
+        is_text = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+        is_number = np.fromiter(
+            (isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)) for v in values),
+            dtype=bool, count=len(values),
+        )
+        result[is_number] = values[is_number].astype(np.float64)
+
+    if is_text.any():
+        result[is_text] = _parse_numeric_text(values[is_text])
+    return pd.Series(result, index=series.index, name=series.name), int(is_text.sum())
+
+
+def _normalize_sheet(df, sheet_name):
+    """시트 데이터프레임의 날짜/숫자 컬럼을 정규화합니다."""
+    # 인덱스 컬럼이 없으면 추가
+    if '날짜' not in df.columns:
+        df = df.reset_index()
+        df = df.rename(columns={'index': '날짜'})
+
+    # 숫자 데이터 변환 (텍스트로 저장된 셀 수 기록)
+    text_cells = {}
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col], text_cells[col] = _coerce_numeric(df[col])
+
+    # 날짜 변환
+    if pd.api.types.is_numeric_dtype(df['날짜']):
+        df['날짜'] = pd.TimedeltaIndex(df['날짜'], unit='D') + pd.Timestamp('1899-12-30')
+    else:
+        df['날짜'] = pd.to_datetime(df['날짜'], errors='coerce')
+
+    # 결측치 처리
+    df = df.dropna(subset=['날짜'])
+
+    # 시트 이름을 구분으로 추가
+    df['sheet_name'] = sheet_name
+
+    df = compact_layout(df)
+    df.attrs['numeric_text_cells'] = text_cells
+    return df
+
+
+def compact_layout(df):
+    """반복 문자열은 범주형, 측정값은 MEASUREMENT_DTYPE으로 바꿔 메모리 사용량을 줄입니다."""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(MEASUREMENT_DTYPE)
+    return df
+
+
+def memory_report(all_data):
+    """시트별 행 수와 데이터프레임 메모리 사용량(문자열 내용 포함)을 집계합니다."""
+    rows = []
+    for sheet_name, df in all_data.items():
+        rows.append({
+            'sheet_name': sheet_name,
+            '행 수': len(df),
+            '메모리(KB)': df.memory_usage(deep=True).sum() / 1024,
+        })
+    return pd.DataFrame(rows, columns=['sheet_name', '행 수', '메모리(KB)'])
+
+
+def numeric_fallback_report(all_data):
+    """
+    시트/컬럼별로 숫자 셀 수와 텍스트 파싱이 필요했던 셀 수를 집계합니다.
+    텍스트 비율이 높으면 엑셀에서 숫자가 텍스트 서식으로 저장된 것입니다.
+    """
+    rows = []
+    for sheet_name, df in all_data.items():
+        text_cells = df.attrs.get('numeric_text_cells', {})
+        for col, count in text_cells.items():
+            rows.append({
+                'sheet_name': sheet_name,
+                '컬럼': col,
+                '텍스트 변환 셀 수': count,
+                '값 있는 셀 수': int(df[col].notna().sum()),
+            })
+    return pd.DataFrame(rows, columns=['sheet_name', '컬럼', '텍스트 변환 셀 수', '값 있는 셀 수'])
+
+
+class _BufferReader(io.RawIOBase):
+    """메모리 버퍼(bytearray, memoryview)를 복사하지 않고 읽는 읽기 전용 파일 객체"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def readinto(self, b):
+        data = self._view[self._pos:self._pos + len(b)]
+        n = len(data)
+        memoryview(b).cast('B')[:n] = data
+        self._pos += n
+        return n
+
+
+def _open_source(source):
+    """
+    경로, 파일 객체, 메모리 버퍼를 zipfile/openpyxl이 읽을 수 있는 형태로 바꿉니다.
+    메모리 버퍼는 복사하지 않고 매번 새 파일 객체로 감싸므로 호출마다 읽기 위치가 독립적입니다.
+    """
+    if isinstance(source, bytes):
+        # BytesIO는 bytes 내용을 복사하지 않고 공유함
+        return io.BytesIO(source)
+    if isinstance(source, (bytearray, memoryview)):
+        return _BufferReader(source)
+    return source
+
+
+def _iter_sheets_openpyxl(source):
+    """openpyxl 엔진: 읽기 전용 모드로 (시트 이름, 파싱 결과)를 순서대로 생성합니다."""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(_open_source(source), read_only=True, data_only=True)
+    try:
+        # 모든 시트 처리
+        for sheet_name in wb.sheetnames:
+            yield sheet_name, _read_sheet_columns(wb[sheet_name])
+    finally:
+        # 읽기 전용 모드는 파일 핸들을 직접 닫아야 함
+        wb.close()
+
+
+# SpreadsheetML 네임스페이스
+_SSML_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_DOC_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# 날짜 서식으로 취급하는 기본 제공 numFmtId
+_BUILTIN_DATE_FORMATS = (
+    set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+)
+
+# 셀 종류 코드
+_CELL_EMPTY, _CELL_NUMBER, _CELL_DATE, _CELL_OTHER = 0, 1, 2, 3
+
+
+def _xml_part_path(target):
+    """관계 파일의 Target 값을 zip 내부 경로로 변환합니다."""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join('xl', target))
+
+
+def _read_workbook_parts(zf):
+    """
+    xl/workbook.xml과 관계 파일에서 워크시트 목록과 공유 문자열 경로, 1904 날짜 체계 여부를 읽습니다.
+    """
+    rels = {}
+    shared_strings_path = None
+    with zf.open('xl/_rels/workbook.xml.rels') as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == _PKG_REL_NS + 'Relationship':
+                rel_type = elem.get('Type', '')
+                if rel_type.endswith('/worksheet'):
+                    rels[elem.get('Id')] = _xml_part_path(elem.get('Target'))
+                elif rel_type.endswith('/sharedStrings'):
+                    shared_strings_path = _xml_part_path(elem.get('Target'))
+
+    sheets = []
+    date1904 = False
+    with zf.open('xl/workbook.xml') as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == _SSML_NS + 'sheet':
+                # 차트 시트 등 워크시트가 아닌 항목은 제외
+                part = rels.get(elem.get(_DOC_REL_NS + 'id'))
+                if part is not None:
+                    sheets.append((elem.get('name'), part))
+            elif elem.tag == _SSML_NS + 'workbookPr':
+                date1904 = elem.get('date1904') in ('1', 'true')
+
+    return sheets, shared_strings_path, date1904
+
+
+def _rich_text(elem):
+    """<si> 또는 <is> 요소의 텍스트를 합칩니다 (윗주 rPh는 제외)."""
+    parts = []
+    for child in elem:
+        if child.tag == _SSML_NS + 't':
+            parts.append(child.text or '')
+        elif child.tag == _SSML_NS + 'r':
+            t = child.find(_SSML_NS + 't')
+            if t is not None:
+                parts.append(t.text or '')
+    return ''.join(parts)
+
+
+def _read_shared_strings(zf, path):
+    """공유 문자열 테이블을 스트리밍으로 읽어 리스트로 반환합니다."""
+    strings = []
+    if path is None or path not in zf.namelist():
+        return strings
+    with zf.open(path) as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == _SSML_NS + 'si':
+                strings.append(_rich_text(elem))
+                elem.clear()
+    return strings
+
+
+def _is_date_format(code):
+    """사용자 정의 숫자 서식 코드가 날짜/시간 서식인지 판단합니다."""
+    # 따옴표 문자열, [색상/조건] 블록, 이스케이프 문자 제거 후 날짜 기호 검사
+    code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', '', code)
+    return re.search(r'[dmyhs]', code, re.IGNORECASE) is not None
+
+
+def _read_date_styles(zf):
+    """셀 스타일(cellXfs) 중 날짜 서식을 쓰는 스타일 인덱스 집합을 반환합니다."""
+    if 'xl/styles.xml' not in zf.namelist():
+        return set()
+    with zf.open('xl/styles.xml') as f:
+        root = ET.parse(f).getroot()
+
+    date_formats = set(_BUILTIN_DATE_FORMATS)
+    num_fmts = root.find(_SSML_NS + 'numFmts')
+    if num_fmts is not None:
+        for fmt in num_fmts:
+            if _is_date_format(fmt.get('formatCode', '')):
+                date_formats.add(int(fmt.get('numFmtId')))
+
+    date_styles = set()
+    cell_xfs = root.find(_SSML_NS + 'cellXfs')
+    if cell_xfs is not None:
+        for i, xf in enumerate(cell_xfs):
+            if int(xf.get('numFmtId', 0)) in date_formats:
+                date_styles.add(i)
+    return date_styles
+
+
+@functools.lru_cache(maxsize=None)
+def _column_letters_index(letters):
+    """열 문자(예: 'C')를 0부터 시작하는 열 번호로 변환합니다."""
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + (ord(ch) - 64)
+    return index - 1
+
+
+def _column_index(ref):
+    """셀 참조(예: 'C12')에서 0부터 시작하는 열 번호를 계산합니다."""
+    return _column_letters_index(ref.rstrip('0123456789'))
+
+
+def _excel_serial_to_datetime64(serial, date1904):
+    """엑셀 일련번호 배열을 datetime64 배열로 변환합니다 (NaN은 NaT)."""
+    serial = np.asarray(serial, dtype=np.float64).copy()
+    if date1904:
+        epoch = np.datetime64('1904-01-01', 'us')
+    else:
+        epoch = np.datetime64('1899-12-30', 'us')
+        # 1900년 윤년 버그 보정 (openpyxl과 동일)
+        serial[(serial > 0) & (serial < 60)] += 1
+
+    missing = np.isnan(serial)
+    micros = np.round(np.where(missing, 0, serial) * 86_400_000_000).astype(np.int64)
+    result = epoch + micros.astype('timedelta64[us]')
+    result[missing] = np.datetime64('NaT')
+    return result.astype('datetime64[ns]')
+
+
+def _finalize_column(num, obj, kind, date1904):
+    """셀 종류에 따라 타입이 지정된 NumPy 컬럼을 만듭니다."""
+    kinds = set(np.unique(kind).tolist()) - {_CELL_EMPTY}
+
+    if kinds == {_CELL_NUMBER}:
+        # 빈 셀이 없고 모두 정수이면 정수형, 아니면 실수형 (빈 셀은 NaN)
+        if (kind == _CELL_NUMBER).all() and np.array_equal(num, np.floor(num)):
+            return num.astype(np.int64)
+        return num
+
+    if kinds == {_CELL_DATE}:
+        return _excel_serial_to_datetime64(np.where(kind == _CELL_DATE, num, np.nan), date1904)
+
+    # 혼합 컬럼은 파이썬 객체로 유지
+    column = obj.copy()
+    number_mask = kind == _CELL_NUMBER
+    if number_mask.any():
+        column[number_mask] = [int(v) if v.is_integer() else v for v in num[number_mask].tolist()]
+    date_mask = kind == _CELL_DATE
+    if date_mask.any():
+        column[date_mask] = _excel_serial_to_datetime64(num[date_mask], date1904).astype(
+            'datetime64[us]').astype(object)
+    return column
+
+
+def _parse_sheet_xml(f, shared_strings, date_styles, date1904, used_strings=None):
+    """
+    워크시트 XML을 증분 파싱하여 셀 값을 타입별 배열(숫자, 객체, 셀 종류)에 바로 기록합니다.
+    헤더와 데이터 행이 모두 있으면 (headers, columns)를, 없으면 None을 반환합니다.
+    used_strings: 집합을 넘기면 참조한 공유 문자열 인덱스를 기록
+    """
+    row_tag = _SSML_NS + 'row'
+    value_tag = _SSML_NS + 'v'
+    inline_tag = _SSML_NS + 'is'
+    dimension_tag = _SSML_NS + 'dimension'
+
+    headers = {}
+    n_cols = 0
+    capacity = 0
+    n_rows = 0
+    num = obj = kind = None
+    row_idx = 0
+    nan = float('nan')
+
+    for _, elem in ET.iterparse(f):
+        tag = elem.tag
+        if tag == row_tag:
+            r = elem.get('r')
+            row_idx = int(r) if r else row_idx + 1
+            col_idx = -1
+
+            for cell in elem:
+                ref = cell.get('r')
+                col_idx = _column_index(ref) if ref else col_idx + 1
+
+                # 셀 값 해석
+                cell_type = cell.get('t', 'n')
+                v = cell.find(value_tag)
+                text = v.text if v is not None else None
+                if cell_type == 'inlineStr':
+                    is_elem = cell.find(inline_tag)
+                    if is_elem is None:
+                        continue
+                    value, code = _rich_text(is_elem), _CELL_OTHER
+                elif text is None:
+                    continue
+                elif cell_type == 's':
+                    string_idx = int(text)
+                    value, code = shared_strings[string_idx], _CELL_OTHER
+                    if used_strings is not None:
+                        used_strings.add(string_idx)
+                elif cell_type == 'n':
+                    value = float(text)
+                    code = _CELL_DATE if int(cell.get('s', 0)) in date_styles else _CELL_NUMBER
+                elif cell_type == 'b':
+                    value, code = text == '1', _CELL_OTHER
+                elif cell_type == 'd':
+                    value, code = datetime.fromisoformat(text), _CELL_OTHER
+                else:  # 'str', 'e'
+                    value, code = text, _CELL_OTHER
+
+                if row_idx == 1:
+                    # 헤더 행
+                    if code == _CELL_DATE:
+                        value = pd.Timestamp(_excel_serial_to_datetime64([value], date1904)[0]).to_pydatetime()
+                    elif code == _CELL_NUMBER and value.is_integer():
+                        value = int(value)
+                    headers[col_idx] = value
+                    n_cols = max(n_cols, col_idx + 1)
+                    continue
+
+                if num is None:
+                    # 첫 데이터 셀에서 컬럼 버퍼를 미리 할당
+                    if headers:
+                        n_cols = max(n_cols, max(headers) + 1)
+                    capacity = max(capacity, 1024)
+                    num = [[nan] * capacity for _ in range(n_cols)]
+                    obj = [[None] * capacity for _ in range(n_cols)]
+                    kind = [bytearray(capacity) for _ in range(n_cols)]
+                i = row_idx - 2
+                if i >= capacity:
+                    # dimension 정보가 부정확하면 두 배씩 늘림
+                    grow = max(capacity, i + 1 - capacity)
+                    for j in range(n_cols):
+                        num[j].extend([nan] * grow)
+                        obj[j].extend([None] * grow)
+                        kind[j].extend(bytes(grow))
+                    capacity += grow
+                if col_idx < n_cols:
+                    if code == _CELL_OTHER:
+                        obj[col_idx][i] = value
+                    else:
+                        num[col_idx][i] = value
+                    kind[col_idx][i] = code
+                    if i >= n_rows:
+                        n_rows = i + 1
+
+            # 처리한 행은 바로 비워 메모리를 일정하게 유지
+            elem.clear()
+        elif tag == dimension_tag:
+            # 예: 'A1:G2256' -> 7열, 2255개 데이터 행
+            last = elem.get('ref', 'A1').split(':')[-1]
+            n_cols = _column_index(last) + 1
+            digits = last[len(last.rstrip('0123456789')):]
+            capacity = max(int(digits or 1) - 1, 0)
+
+    if not headers or n_rows == 0:
+        return None
+
+    header_row = tuple(headers.get(j) for j in range(n_cols))
+    columns = [
+        _finalize_column(
+            np.array(num[j][:n_rows], dtype=np.float64),
+            np.array(obj[j][:n_rows] + [None], dtype=object)[:-1],
+            np.frombuffer(kind[j], dtype=np.int8, count=n_rows),
+            date1904,
+        )
+        for j in range(n_cols)
+    ]
+    return header_row, columns
+
+
+def _iter_sheets_xml(source):
+    """
+    XML 엔진: openpyxl을 거치지 않고 zip 안의 워크시트 XML을 직접 증분 파싱합니다.
+    공유 문자열, 숫자, 엑셀 날짜 일련번호를 타입이 지정된 NumPy 컬럼으로 바로 변환합니다.
+    """
+    with zipfile.ZipFile(_open_source(source)) as zf:
+        sheets, shared_strings_path, date1904 = _read_workbook_parts(zf)
+        shared_strings = _read_shared_strings(zf, shared_strings_path)
+        date_styles = _read_date_styles(zf)
+
+        for sheet_name, part in sheets:
+            with zf.open(part) as f:
+                yield sheet_name, _parse_sheet_xml(f, shared_strings, date_styles, date1904)
+
+
+@contextlib.contextmanager
+def _xlwings_book(source):
+    """엑셀 프로그램으로 워크북을 열고, 끝나면 닫습니다 (메모리 버퍼는 임시 파일로 저장해서 엶)."""
+    import xlwings as xw
+
+    # COM 초기화 (Windows 환경에서만 필요)
+    if platform.system() == 'Windows':
+        import pythoncom
+        pythoncom.CoInitialize()
+
+    temp_path = None
+    if not isinstance(source, (str, os.PathLike)):
+        f = _open_source(source)
+        f.seek(0)
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
+            shutil.copyfileobj(f, tmp)
+            temp_path = tmp.name
+
+    app = xw.App(visible=False, add_book=False)
+    try:
+        wb = app.books.open(temp_path or os.fspath(source))
+        try:
+            yield wb
+        finally:
+            wb.close()
+    finally:
+        app.quit()
+        if temp_path is not None:
+            os.unlink(temp_path)
+
+
+def _read_sheet_xlwings(sheet):
+    """xlwings 시트의 사용 범위를 한 번에 읽어 (headers, columns)로 바꿉니다. 데이터가 없으면 None."""
+    values = sheet.used_range.options(ndim=2).value
+    if not values or len(values) < 2:
+        return None
+
+    headers = tuple(values[0])
+    rows = values[1:]
+    columns = []
+    for j in range(len(headers)):
+        column = np.empty(len(rows), dtype=object)
+        column[:] = [row[j] for row in rows]
+        columns.append(column)
+    return headers, columns
+
+
+def _iter_sheets_xlwings(source):
+    """xlwings 엔진: 엑셀 프로그램(COM)으로 (시트 이름, 파싱 결과)를 순서대로 생성합니다."""
+    with _xlwings_book(source) as wb:
+        for sheet in wb.sheets:
+            yield sheet.name, _read_sheet_xlwings(sheet)
+
+
+# 사용 가능한 엑셀 읽기 엔진 (모두 같은 (headers, columns) 결과를 _normalize_sheet로 정규화)
+# CSV/TSV는 xlsx 엔진이 아니라 파일 확장자로 고르는 형식이므로 read_file에서 read_csv_workbook으로 읽음
+WORKBOOK_ENGINES = {
+    'openpyxl': _iter_sheets_openpyxl,
+    'xml': _iter_sheets_xml,
+}
+if XLWINGS_AVAILABLE:
+    WORKBOOK_ENGINES['xlwings'] = _iter_sheets_xlwings
+
+# 기본 엑셀 읽기 엔진 (환경 변수 WORKBOOK_ENGINE으로 지정, 사용할 수 없는 엔진이면 xml)
+DEFAULT_ENGINE = os.environ.get('WORKBOOK_ENGINE', 'xml')
+if DEFAULT_ENGINE == 'csv':
+    warnings.warn("CSV/TSV 파일은 확장자로 자동 선택되므로 "
+                  "WORKBOOK_ENGINE은 엑셀 읽기 엔진만 지정합니다. xml 엔진을 사용합니다.")
+    DEFAULT_ENGINE = 'xml'
+elif DEFAULT_ENGINE not in WORKBOOK_ENGINES:
+    warnings.warn(f"엑셀 읽기 엔진 '{DEFAULT_ENGINE}'을(를) 이 환경에서 사용할 수 없어 xml 엔진을 사용합니다.")
+    DEFAULT_ENGINE = 'xml'
+
+
+def _env_workers(name, default):
+    """환경 변수 name의 작업 프로세스 수 (1보다 작은 값은 경고 후 1로 바꿈)"""
+    workers = int(os.environ.get(name, default))
+    if workers < 1:
+        warnings.warn(f"{name}={workers}은(는) 1 이상이어야 하므로 1(순차 처리)을 사용합니다.")
+        workers = 1
+    return workers
+
+
+# 병렬 파싱에 사용할 작업 프로세스 수 (기본값 1은 순차 처리, 환경 변수 INGEST_WORKERS로 늘릴 수 있음)
+INGEST_WORKERS = _env_workers('INGEST_WORKERS', 1)
+
+# 여러 파일을 한 번에 올렸을 때 파일별로 동시에 파싱할 작업 프로세스 수
+# (환경 변수 UPLOAD_WORKERS로 지정, 기본값은 CPU 수이며 파일 수보다 많이 띄우지 않음)
+UPLOAD_WORKERS = _env_workers('UPLOAD_WORKERS', os.cpu_count() or 1)
+
+# 작업 프로세스별 상태 (원본 파일, 엔진, XML 파싱 컨텍스트)
+_worker_state = {}
+
+
+def _build_sheet_frame(parsed, sheet_name):
+    """파싱 결과 (headers, columns)로 정규화된 데이터프레임을 만듭니다."""
+    headers, columns = parsed
+    df = pd.DataFrame(dict(enumerate(columns)))
+    df.columns = list(headers)
+    return _normalize_sheet(df, sheet_name)
+
+
+def _init_sheet_worker(source, engine, xml_context):
+    """작업 프로세스 초기화: 원본 파일과 공유 문자열 등을 프로세스당 한 번만 받아 둡니다."""
+    _worker_state.update(source=source, engine=engine, xml_context=xml_context)
+
+
+def _parse_single_sheet(source, engine, sheet_name, part, xml_context, used_strings=None):
+    """
+    워크북에서 시트 하나만 파싱하고 정규화합니다. 데이터가 없으면 None을 반환합니다.
+    xml_context: XML 엔진용 (공유 문자열, 날짜 스타일, 1904 날짜 체계 여부)
+    used_strings: XML 엔진에서 참조한 공유 문자열 인덱스를 기록할 집합
+    """
+    if engine == 'xml':
+        with zipfile.ZipFile(_open_source(source)) as zf, zf.open(part) as f:
+            parsed = _parse_sheet_xml(f, *xml_context, used_strings=used_strings)
+    elif engine == 'xlwings':
+        with _xlwings_book(source) as wb:
+            parsed = _read_sheet_xlwings(wb.sheets[sheet_name])
+    else:
+        import openpyxl
+
+        wb = openpyxl.load_workbook(_open_source(source), read_only=True, data_only=True)
+        try:
+            parsed = _read_sheet_columns(wb[sheet_name])
+        finally:
+            wb.close()
+    return None if parsed is None else _build_sheet_frame(parsed, sheet_name)
+
+
+def _parse_sheet_task(sheet_name, part):
+    """작업 프로세스에서 시트 하나를 파싱하고 정규화합니다."""
+    return _parse_single_sheet(
+        _worker_state['source'], _worker_state['engine'],
+        sheet_name, part, _worker_state['xml_context'],
+    )
+
+
+def _read_workbook_parallel(source, engine, workers):
+    """시트별 파싱과 정규화를 작업 프로세스에 나누어 처리합니다."""
+    # 파일 객체와 memoryview는 프로세스 간에 넘길 수 없으므로 내용을 bytes로 전달
+    if hasattr(source, 'read'):
+        source.seek(0)
+        source = source.read()
+    elif isinstance(source, (bytearray, memoryview)):
+        source = bytes(source)
+
+    with zipfile.ZipFile(_open_source(source)) as zf:
+        sheets, shared_strings_path, date1904 = _read_workbook_parts(zf)
+        xml_context = None
+        if engine == 'xml':
+            xml_context = (_read_shared_strings(zf, shared_strings_path), _read_date_styles(zf), date1904)
+
+    if not sheets:
+        return {}
+    sheet_names = [sheet_name for sheet_name, _ in sheets]
+    parts = [part for _, part in sheets]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(sheets)),
+        initializer=_init_sheet_worker,
+        initargs=(source, engine, xml_context),
+    ) as executor:
+        frames = list(executor.map(_parse_sheet_task, sheet_names, parts))
+
+    return {
+        sheet_name: df
+        for sheet_name, df in zip(sheet_names, frames)
+        if df is not None
+    }
+
+
+def read_workbook(source, engine=DEFAULT_ENGINE, workers=1):
+    """
+    엑셀 파일을 스트리밍 방식으로 읽어 시트별 데이터프레임 딕셔너리를 반환합니다.
+    전체 셀 객체 그래프를 만들지 않으므로 메모리 사용량과 파싱 시간이 줄어듭니다.
+    engine: 'openpyxl' (읽기 전용 모드) 또는 'xml' (SpreadsheetML 직접 파싱)
+    workers: 2 이상이면 시트를 작업 프로세스에 나누어 병렬로 파싱
+    """
+    if engine not in WORKBOOK_ENGINES:
+        raise ValueError(f"지원하지 않는 엔진입니다: {engine}")
+
+    if workers > 1:
+        return _read_workbook_parallel(source, engine, workers)
+
+    all_data = {}
+    for sheet_name, parsed in WORKBOOK_ENGINES[engine](source):
+        # 헤더가 있다고 가정하고 데이터프레임 생성
+        if parsed is not None:
+            all_data[sheet_name] = _build_sheet_frame(parsed, sheet_name)
+
+    return all_data
+
+
+# 시트 캐시에 보관할 최대 시트 수 (가장 오래 사용하지 않은 시트부터 제거)
+SHEET_CACHE_MAX_ENTRIES = 64
+
+
+def _strings_digest(shared_strings, indices):
+    """공유 문자열 중 indices 위치에 있는 문자열 내용의 해시 (범위를 벗어나면 None)"""
+    if indices and indices[-1] >= len(shared_strings):
+        return None
+    digest = hashlib.sha1()
+    for i in indices:
+        digest.update(shared_strings[i].encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class SheetCache:
+    """
+    시트 지문별로 파싱된 데이터프레임을 보관하는 LRU 캐시입니다.
+    여러 LazyWorkbook이 공유하면, 다시 업로드한 워크북에서 바뀌지 않은 시트는 파싱하지 않고 재사용합니다.
+    """
+
+    def __init__(self, max_entries=SHEET_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LazyWorkbook(Mapping):
+    """
+    시트 목록(xl/workbook.xml)만 먼저 읽고, 각 시트는 처음 요청될 때 파싱하여 보관하는 워크북입니다.
+    dict처럼 workbook[sheet_name]으로 접근하며, 여러 세션이 공유해도 시트당 한 번만 파싱합니다.
+    sheet_cache(SheetCache)를 넘기면 시트 XML과 참조하는 공유 문자열이 같은 시트는 캐시에서 재사용합니다.
+    """
+
+    def __init__(self, source, engine=DEFAULT_ENGINE, sheet_cache=None):
+        if engine not in WORKBOOK_ENGINES:
+            raise ValueError(f"지원하지 않는 엔진입니다: {engine}")
+
+        self._source = source
+        self._engine = engine
+        with zipfile.ZipFile(_open_source(source)) as zf:
+            sheets, self._shared_strings_path, self._date1904 = _read_workbook_parts(zf)
+            self._fingerprints = self._sheet_fingerprints(zf, sheets)
+        self._parts = dict(sheets)
+        self._xml_context = None
+        self._frames = {}
+        self._reused = set()
+        self._sheet_cache = sheet_cache
+        self._lock = threading.Lock()
+
+    def _sheet_fingerprints(self, zf, sheets):
+        """
+        zip 항목의 CRC와 크기로 시트별 지문을 만듭니다 (압축을 풀지 않음).
+        XML 엔진은 공유 문자열을 시트가 참조하는 문자열 단위로 따로 비교하고,
+        openpyxl 엔진은 공유 문자열 파일 전체를 지문에 포함합니다.
+        """
+        def crc(path):
+            try:
+                info = zf.getinfo(path)
+            except KeyError:
+                return None
+            return info.CRC, info.file_size
+
+        common = (self._engine, PARSER_VERSION, MEASUREMENT_DTYPE.name,
+                  crc('xl/styles.xml'), self._date1904)
+        if self._engine != 'xml':
+            common += (crc(self._shared_strings_path),)
+        return {
+            sheet_name: common + (sheet_name, crc(part))
+            for sheet_name, part in sheets
+        }
+
+    def _get_xml_context(self):
+        if self._xml_context is None:
+            # 공유 문자열과 스타일은 첫 시트를 읽을 때 한 번만 읽음
+            with zipfile.ZipFile(_open_source(self._source)) as zf:
+                self._xml_context = (
+                    _read_shared_strings(zf, self._shared_strings_path),
+                    _read_date_styles(zf),
+                    self._date1904,
+                )
+        return self._xml_context
+
+    def _load_cached_sheet(self, sheet_name):
+        """지문과 참조 공유 문자열이 같은 시트가 캐시에 있으면 반환합니다."""
+        entry = self._sheet_cache.get(self._fingerprints[sheet_name])
+        if entry is None:
+            return None
+        df, used_strings, strings_digest = entry
+        if self._engine == 'xml' and _strings_digest(self._get_xml_context()[0], used_strings) != strings_digest:
+            return None
+        return df
+
+    def _load_sheet(self, sheet_name):
+        if self._sheet_cache is not None:
+            df = self._load_cached_sheet(sheet_name)
+            if df is not None:
+                self._reused.add(sheet_name)
+                return df
+
+        xml_context = self._get_xml_context() if self._engine == 'xml' else None
+        used_strings = set()
+        df = _parse_single_sheet(
+            self._source, self._engine,
+            sheet_name, self._parts[sheet_name], xml_context, used_strings,
+        )
+        if df is None:
+            # 데이터가 없는 시트는 빈 데이터프레임으로 표시
+            df = pd.DataFrame(columns=['날짜', '항목'] + NUMERIC_COLUMNS + ['sheet_name'])
+
+        if self._sheet_cache is not None:
+            used_strings = sorted(used_strings)
+            strings_digest = _strings_digest(xml_context[0], used_strings) if xml_context else None
+            self._sheet_cache.put(self._fingerprints[sheet_name], (df, used_strings, strings_digest))
+        return df
+
+    def __getitem__(self, sheet_name):
+        if sheet_name not in self._parts:
+            raise KeyError(sheet_name)
+        with self._lock:
+            if sheet_name not in self._frames:
+                self._frames[sheet_name] = self._load_sheet(sheet_name)
+            return self._frames[sheet_name]
+
+    def __iter__(self):
+        return iter(self._parts)
+
+    def __len__(self):
+        return len(self._parts)
+
+    def is_loaded(self, sheet_name):
+        """시트가 이미 파싱되었는지 여부"""
+        return sheet_name in self._frames
+
+    def is_reused(self, sheet_name):
+        """시트를 다시 파싱하지 않고 시트 캐시에서 가져왔는지 여부"""
+        return sheet_name in self._reused
+
+
+# CSV/TSV 파일을 한 번에 읽을 행 수 (읽는 중 최대 메모리 사용량을 제한)
+CSV_CHUNK_ROWS = 200_000
+
+# CSV/TSV에서 시트 이름으로 사용할 컬럼 (없으면 파일 이름을 시트 이름으로 사용)
+CSV_SHEET_COLUMNS = ['sheet_name', '시트', '제품']
+
+# CSV/TSV 인코딩 (UTF-8로 읽을 수 없으면 순서대로 시도)
+CSV_ENCODINGS = ['utf-8-sig', 'cp949']
+
+
+# CSV/TSV로 읽을 파일 확장자
+CSV_EXTENSIONS = ('.csv', '.tsv', '.txt')
+
+
+def is_csv_file(name):
+    """파일 이름이 CSV/TSV 확장자인지 여부"""
+    return name.lower().endswith(CSV_EXTENSIONS)
+
+
+def _csv_separator(name):
+    """파일 이름 확장자로 구분자를 정합니다 (.tsv/.txt는 탭, 그 외는 쉼표)."""
+    return '\t' if os.path.splitext(name)[1].lower() in ('.tsv', '.txt') else ','
+
+
+def _read_csv_chunks(source, name, sep, encoding, chunksize):
+    """CSV를 chunksize 행씩 읽어 시트별로 정규화된 조각을 모읍니다."""
+    default_sheet = os.path.splitext(os.path.basename(name))[0]
+    # 숫자 컬럼도 문자열로 읽은 뒤 엑셀 경로와 같은 규칙(쉼표 제거, 변환 불가 값은 NaN)으로 변환
+    dtype = {col: str for col in ['날짜', '구분', '항목'] + NUMERIC_COLUMNS + CSV_SHEET_COLUMNS}
+
+    pieces = {}
+    reader = pd.read_csv(_open_source(source), sep=sep, dtype=dtype, encoding=encoding,
+                         chunksize=chunksize, skipinitialspace=True)
+    with reader:
+        for chunk in reader:
+            sheet_col = next((col for col in CSV_SHEET_COLUMNS if col in chunk.columns), None)
+            if sheet_col is None:
+                sheets = pd.Series(default_sheet, index=chunk.index)
+            else:
+                sheets = chunk.pop(sheet_col).fillna(default_sheet)
+
+            # 청크 전체를 한 번에 정규화한 뒤 시트별로 나눔
+            df = _normalize_sheet(chunk, default_sheet)
+            df['sheet_name'] = sheets[df.index].astype('category')
+            for sheet_name, part in df.groupby('sheet_name', observed=True, sort=False):
+                pieces.setdefault(sheet_name, []).append(part)
+    return pieces
+
+
+def read_csv_workbook(source, name, sep=None, chunksize=CSV_CHUNK_ROWS):
+    """
+    CSV/TSV 파일을 엑셀과 같은 시트별 데이터프레임 딕셔너리로 읽습니다.
+    시트는 sheet_name(또는 시트, 제품) 컬럼으로 나누고, 컬럼이 없으면 파일 이름을 시트 이름으로 씁니다.
+    chunksize 행씩 읽어 바로 압축 레이아웃으로 바꾸므로 원본 문자열 전체를 메모리에 두지 않습니다.
+    source: 경로, 파일 객체 또는 메모리 버퍼 / name: 원본 파일 이름 (구분자와 기본 시트 이름에 사용)
+    """
+    sep = sep or _csv_separator(name)
+    for encoding in CSV_ENCODINGS:
+        try:
+            pieces = _read_csv_chunks(source, name, sep, encoding, chunksize)
+            break
+        except UnicodeDecodeError:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            if encoding == CSV_ENCODINGS[-1]:
+                raise
+
+    all_data = {}
+    for sheet_name, frames in pieces.items():
+        # CSV는 모든 값이 텍스트이므로 텍스트 변환 셀 수는 기록하지 않음
+        df = compact_layout(pd.concat(frames, ignore_index=True))
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].cat.remove_unused_categories()
+        df.attrs = {}
+        if not df.empty:
+            all_data[sheet_name] = df
+    return all_data
+
+
+# 증분 반영 시 시트 안에서 행을 식별하는 키 (같은 날 같은 항목의 반복 측정은 순번으로 구분)
+INGEST_KEY = ['날짜', '항목']
+
+
+def ingest_occurrence(df):
+    """같은 (날짜, 항목) 안에서 행이 나타난 순번 (0부터 시작하는 정수 Series)"""
+    return df.groupby(INGEST_KEY, sort=False, observed=True, dropna=False).cumcount()
+
+
+def _row_fingerprints(df):
+    """
+    행마다 (날짜, 항목, 순번) 키 해시와 행 전체 값의 해시를 계산합니다.
+    반환: (키 해시 배열, 행 해시 배열, 순번 배열)
+    """
+    occurrence = ingest_occurrence(df)
+    key = pd.DataFrame({
+        # 엔진에 따라 날짜 단위(ns/us)가 달라도 같은 키가 되도록 맞춤
+        '날짜': df['날짜'].astype('datetime64[ns]'),
+        '항목': df['항목'],
+        '순번': occurrence,
+    }, index=df.index)
+    values = df.drop(columns=INGEST_KEY + ['sheet_name'], errors='ignore')
+
+    key_hash = pd.util.hash_pandas_object(key, index=False).to_numpy()
+    row_hash = pd.util.hash_pandas_object(pd.concat([key, values], axis=1), index=False).to_numpy()
+    return key_hash, row_hash, occurrence.to_numpy()
+
+
+def delta_rows(existing, incoming):
+    """incoming 행 중 existing에 없거나 값이 바뀐 행을 표시한 bool 배열"""
+    _, existing_rows, _ = _row_fingerprints(existing)
+    _, incoming_rows, _ = _row_fingerprints(incoming)
+    return ~np.isin(incoming_rows, existing_rows)
+
+
+def merge_sheet(existing, incoming):
+    """
+    incoming 중 existing에 없는 행(신규)과 키는 같지만 값이 바뀐 행(변경)만 existing에 반영합니다.
+    incoming에 없는 기존 행은 그대로 둡니다.
+    반환: (병합된 데이터프레임, 신규 행 수, 변경 행 수)
+    """
+    if incoming is existing:
+        # 시트 캐시에서 재사용된 같은 데이터프레임
+        return existing, 0, 0
+
+    existing_keys, existing_rows, existing_occurrence = _row_fingerprints(existing)
+    incoming_keys, incoming_rows, incoming_occurrence = _row_fingerprints(incoming)
+
+    # 행 전체 해시가 기존에 있으면 변경 없음
+    is_delta = ~np.isin(incoming_rows, existing_rows)
+    if not is_delta.any():
+        return existing, 0, 0
+
+    delta_keys = incoming_keys[is_delta]
+    is_changed = np.isin(delta_keys, existing_keys)
+    replaced = np.isin(existing_keys, delta_keys[is_changed])
+
+    kept = existing[~replaced].assign(_순번=existing_occurrence[~replaced])
+    delta = incoming[is_delta].assign(_순번=incoming_occurrence[is_delta])
+    merged = (
+        pd.concat([kept, delta], ignore_index=True)
+        .sort_values(['날짜', '_순번'], kind='stable')
+        .drop(columns='_순번')
+        .reset_index(drop=True)
+    )
+    # 범주가 다른 범주형 컬럼은 concat 후 object가 되므로 다시 압축
+    merged = compact_layout(merged)
+    merged.attrs = dict(existing.attrs)
+
+    n_changed = int(is_changed.sum())
+    return merged, len(delta_keys) - n_changed, n_changed
+
+
+def merge_workbook(base, incoming):
+    """
+    시트별로 merge_sheet를 적용해 새 워크북 딕셔너리를 만듭니다. base는 수정하지 않습니다.
+    반환: (병합된 워크북, 시트별 신규/변경 행 수 데이터프레임)
+    """
+    merged = dict(base)
+    rows = []
+    for sheet_name, df in incoming.items():
+        if df.empty:
+            continue
+        if sheet_name in merged and not merged[sheet_name].empty:
+            merged[sheet_name], n_new, n_changed = merge_sheet(merged[sheet_name], df)
+        else:
+            merged[sheet_name], n_new, n_changed = df, len(df), 0
+        rows.append({'sheet_name': sheet_name, '신규 행 수': n_new, '변경 행 수': n_changed})
+    return merged, pd.DataFrame(rows, columns=['sheet_name', '신규 행 수', '변경 행 수'])
+
+
+def read_file(name, source, engine=DEFAULT_ENGINE):
+    """
+    파일 이름 확장자에 따라 CSV/TSV 또는 엑셀(engine)로 읽어 시트별 데이터프레임 딕셔너리를 반환합니다.
+    engine은 엑셀 파일에만 적용되며, 어느 경로로 읽어도 _normalize_sheet로 같은 레이아웃으로 정규화됩니다.
+    """
+    if is_csv_file(name):
+        return read_csv_workbook(source, name)
+    return read_workbook(source, engine=engine)
+
+
+def read_files(files, workers=1, return_exceptions=False):
+    """
+    여러 파일을 읽어 파일 순서대로 시트별 데이터프레임 딕셔너리 목록을 반환합니다.
+    files: (파일 이름, 경로 또는 bytes) 목록
+    workers: 2 이상이면 파일별로 작업 프로세스에 나누어 동시에 파싱
+    return_exceptions: True면 읽지 못한 파일 자리에 예외를 넣고 나머지 파일은 계속 읽음
+    """
+    def result(read):
+        try:
+            return read()
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            futures = [executor.submit(read_file, name, source) for name, source in files]
+            return [result(future.result) for future in futures]
+    return [result(functools.partial(read_file, name, source)) for name, source in files]
+
+
+def merge_catalog(workbooks):
+    """
+    여러 워크북의 시트를 시트 이름별로 합칩니다 (시트 순서는 처음 나온 순서).
+    (날짜, 항목, 순번)이 겹치는 행은 뒤에 있는 워크북의 행을 남깁니다.
+    순번은 파일마다 같은 날 같은 항목의 반복 측정에 매긴 번호이므로 파일 안의 반복 측정은 유지됩니다.
+    """
+    frames = {}
+    for workbook in workbooks:
+        for sheet_name, df in workbook.items():
+            if not df.empty:
+                frames.setdefault(sheet_name, []).append(df.assign(_순번=ingest_occurrence(df)))
+
+    catalog = {}
+    for sheet_name, parts in frames.items():
+        if len(parts) == 1:
+            catalog[sheet_name] = parts[0].drop(columns='_순번')
+            continue
+        # 파일별 반복 재구성 없이 한 번에 이어 붙이고 키 중복만 제거
+        merged = (
+            pd.concat(parts, ignore_index=True)
+            .drop_duplicates(subset=INGEST_KEY + ['_순번'], keep='last')
+            .sort_values('날짜', kind='stable')
+            .drop(columns='_순번')
+            .reset_index(drop=True)
+        )
+        catalog[sheet_name] = compact_layout(merged)
+    return catalog
+
+
+class ItemIndex:
+    """
+    시트 데이터를 날짜 내림차순(최근 데이터가 앞)으로 한 번 정렬해 두고 항목별 행 위치를 기억하는 색인.
+    항목별 데이터는 전체 프레임을 다시 훑지 않고 위치 배열로 바로 잘라냅니다 (항목 행 수에 비례).
+    recent(), between()으로 고른 표시 범위도 같은 정렬 프레임을 공유하는 색인으로 반환합니다.
+
+    key는 (색인 번호, 표시 범위 조건...) 튜플로, 같은 데이터의 같은 표시 범위면 같은 값입니다.
+    색인 번호는 프로세스 안에서 색인을 만들 때마다 새로 매기므로 결과 캐시의 키로 쓸 수 있습니다.
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, df, positions=None, key=None, source=None):
+        # 색인을 만든 원본 데이터프레임 (색인이 살아 있는 동안 함께 유지)
+        self.source = df if source is None else source
+        if positions is None:
+            df = df.sort_values('날짜', ascending=False, kind='stable').reset_index(drop=True)
+            positions = df.groupby('항목', observed=True, sort=False).indices
+        self._frame = df
+        # 항목 -> 정렬 프레임의 행 위치 (오름차순, 즉 날짜 내림차순)
+        self._positions = positions
+        self.key = (next(ItemIndex._ids),) if key is None else key
+
+    def _select(self, positions, condition):
+        return ItemIndex(self._frame, positions, key=self.key + (condition,), source=self.source)
+
+    def recent(self, n):
+        """항목별 최근 n개 행만 남긴 색인"""
+        return self._select({item: pos[:n] for item, pos in self._positions.items()}, ('recent', n))
+
+    def date_bounds(self):
+        """정렬 프레임의 (최소 날짜, 최대 날짜), 데이터가 없으면 (None, None)"""
+        dates = self._frame['날짜']
+        if dates.empty:
+            return None, None
+        return dates.iloc[-1], dates.iloc[0]
+
+    def between(self, start_date, end_date):
+        """
+        start_date ~ end_date (양 끝 날짜 포함) 범위의 행만 남긴 색인.
+        정렬된 날짜 컬럼과 항목별 위치 배열을 이진 탐색하므로 전체 행을 훑지 않습니다.
+        """
+        # 날짜 내림차순 배열을 뒤집은 오름차순 뷰에서 [start, end + 1일) 구간을 찾음
+        ascending = self._frame['날짜'].to_numpy()[::-1]
+        n = len(ascending)
+        lo = np.searchsorted(ascending, pd.Timestamp(start_date).to_datetime64(), side='left')
+        hi = np.searchsorted(
+            ascending, (pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_datetime64(), side='left'
+        )
+        # 내림차순 프레임의 행 위치 [n - hi, n - lo)
+        first, last = n - hi, n - lo
+        return self._select({
+            item: pos[np.searchsorted(pos, first):np.searchsorted(pos, last)]
+            for item, pos in self._positions.items()
+        }, ('between', start_date, end_date))
+
+    def to_frame(self):
+        """색인에 남은 모든 행 (날짜 내림차순)"""
+        if len(self._positions) == 0:
+            return self._frame.iloc[:0]
+        pos = np.sort(np.concatenate(list(self._positions.values())))
+        if len(pos) == len(self._frame):
+            return self._frame
+        return self._frame.iloc[pos]
+
+    def frame_positions(self):
+        """
+        to_frame() 결과의 행 위치로 바꾼 항목별 행 위치 (행이 없는 항목은 제외).
+        ItemStatistics가 항목별로 다시 묶지 않고 이 색인의 위치를 그대로 쓸 수 있습니다.
+        """
+        positions = {item: pos for item, pos in self._positions.items() if len(pos)}
+        if not positions:
+            return {}
+        selected = np.sort(np.concatenate(list(positions.values())))
+        if len(selected) == len(self._frame):
+            return positions
+        return {item: np.searchsorted(selected, pos) for item, pos in positions.items()}
+
+
+# 파싱 결과를 저장하는 디스크 캐시 디렉터리
+WORKBOOK_CACHE_DIR = '.cache/workbooks'
+
+# 파서 버전 (파싱/정규화 결과가 바뀌면 올려서 기존 디스크 캐시를 무효화)
+PARSER_VERSION = 3
+
+
+def file_sha256(path):
+    """파일 내용의 SHA-256 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _workbook_cache_prefix(path):
+    """원본 파일 경로별 캐시 디렉터리 접두어 (같은 파일의 이전 버전 캐시 정리용)"""
+    return hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:8]
+
+
+def _load_workbook_cache(cache_path):
+    """디스크 캐시에서 시트별 데이터프레임을 읽습니다. 캐시가 없으면 None을 반환합니다."""
+    manifest_path = os.path.join(cache_path, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    return {
+        sheet['name']: pd.read_parquet(os.path.join(cache_path, sheet['file']))
+        for sheet in manifest['sheets']
+    }
+
+
+def _save_workbook_cache(cache_path, all_data):
+    """시트별 데이터프레임을 Parquet 파일로 저장하고 목록(manifest.json)을 기록합니다."""
+    parent = os.path.dirname(cache_path)
+    os.makedirs(parent, exist_ok=True)
+
+    # 임시 디렉터리에 먼저 쓰고 이름을 바꿔 다른 프로세스가 불완전한 캐시를 읽지 않도록 함
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        sheets = []
+        for i, (sheet_name, df) in enumerate(all_data.items()):
+            file_name = f"sheet{i}.parquet"
+            df.to_parquet(os.path.join(tmp_path, file_name))
+            sheets.append({'name': sheet_name, 'file': file_name})
+
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({'parser_version': PARSER_VERSION, 'sheets': sheets}, f, ensure_ascii=False)
+
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+
+def read_workbook_cached(path, engine=DEFAULT_ENGINE, cache_dir=WORKBOOK_CACHE_DIR, workers=1):
+    """
+    디스크 캐시(Parquet)를 거쳐 엑셀 파일을 읽습니다.
+    캐시 키는 파일 내용 해시와 파서 버전, 엔진, 측정값 자료형이므로 파일이 바뀌면 자동으로 다시 파싱합니다.
+    """
+    prefix = _workbook_cache_prefix(path)
+    cache_name = f"{prefix}-{file_sha256(path)[:16]}-v{PARSER_VERSION}-{engine}-{MEASUREMENT_DTYPE.name}"
+    cache_path = os.path.join(cache_dir, cache_name)
+
+    try:
+        cached = _load_workbook_cache(cache_path)
+        if cached is not None:
+            return cached
+    except Exception:
+        # 손상된 캐시는 지우고 다시 파싱
+        shutil.rmtree(cache_path, ignore_errors=True)
+
+    all_data = read_workbook(path, engine=engine, workers=workers)
+
+    try:
+        _save_workbook_cache(cache_path, all_data)
+
+        # 같은 원본 파일의 이전 버전 캐시 정리
+        for name in os.listdir(cache_dir):
+            if name.startswith(prefix + '-') and name != cache_name:
+                shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+    except Exception:
+        # 캐시 저장 실패(쓰기 권한, Parquet로 저장할 수 없는 컬럼 등)는 무시
+        pass
+
+    return all_data
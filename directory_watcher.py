@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+데이터 폴더 감시 모듈
+
+측정 장비가 엑셀/CSV 파일을 저장하는 폴더를 백그라운드 스레드에서 주기적으로 확인하고,
+새로 생기거나 바뀐 파일만 읽어 공유 카탈로그(시트별 데이터프레임)에 증분 반영합니다.
+화면 스레드는 snapshot()으로 최신 카탈로그를 가져가기만 하므로 파싱 중에도 멈추지 않습니다.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from data_loader import (
+    CSV_EXTENSIONS, INGEST_WORKERS, file_sha256, merge_catalog, merge_workbook, read_files,
+)
+
+
+# 감시할 폴더 (환경 변수 WATCH_DIR로 지정하면 사용)
+WATCH_DIR = os.environ.get('WATCH_DIR')
+
+# 폴더 확인 주기 (초)
+WATCH_INTERVAL_SECONDS = float(os.environ.get('WATCH_INTERVAL', 10))
+
+# 마지막 수정 후 이 시간(초)이 지나지 않은 파일은 아직 쓰는 중일 수 있으므로 다음 확인 때 읽음
+WATCH_SETTLE_SECONDS = 2.0
+
+# 감시 대상 파일 확장자
+WATCH_EXTENSIONS = ('.xlsx',) + CSV_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+
+class DirectoryWatcher:
+    """
+    폴더의 파일을 (수정 시각, 크기)로 먼저 거르고, 바뀐 파일만 내용 해시로 확인해 다시 읽습니다.
+    읽은 행은 (시트, 날짜, 항목) 키로 기존 카탈로그에 합치며, 폴더에서 지운 파일의 행은 유지합니다.
+    store를 넘기면 같은 행을 이력 저장소에도 반영합니다.
+    """
+
+    def __init__(self, path, interval=WATCH_INTERVAL_SECONDS, store=None, workers=INGEST_WORKERS):
+        self.path = path
+        self.interval = interval
+        self._store = store
+        self._workers = workers
+
+        # 파일 경로 -> (수정 시각, 크기, 내용 해시)
+        self._files = {}
+        # 반영하지 못한 파일 경로 -> 오류 메시지
+        self.errors = {}
+        # 읽지 못한(손상된) 파일 경로 -> (수정 시각, 크기, 내용 해시), 내용이 바뀔 때까지 다시 읽지 않음
+        self._failed = {}
+        self.last_scan = None
+
+        self._data = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """백그라운드 감시 스레드를 시작합니다."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='directory-watcher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """감시 스레드를 멈추고 끝날 때까지 기다립니다."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception:
+                logger.exception("데이터 폴더 확인 중 오류 발생: %s", self.path)
+            self._stop.wait(self.interval)
+
+    def snapshot(self):
+        """(버전, 카탈로그)를 반환합니다. 버전은 새 데이터가 반영될 때마다 1씩 늘어납니다."""
+        with self._lock:
+            return self._version, self._data
+
+    @property
+    def file_count(self):
+        """반영된 파일 수"""
+        return len(self._files)
+
+    def _changed_files(self):
+        """새로 생기거나 내용이 바뀐 파일의 (경로, 수정 시각, 크기, 해시) 목록 (수정 시각 순)"""
+        now = time.time()
+        changed = []
+        for entry in os.scandir(self.path):
+            name = entry.name
+            # 엑셀 잠금 파일(~$...)과 숨김 파일 제외
+            if not entry.is_file() or name.startswith(('~$', '.')) or not name.lower().endswith(WATCH_EXTENSIONS):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime < WATCH_SETTLE_SECONDS:
+                continue
+
+            # 읽지 못한 파일은 실패했을 때의 내용과 비교
+            seen = self._failed if entry.path in self._failed else self._files
+            known = seen.get(entry.path)
+            if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            digest = file_sha256(entry.path)
+            if known is not None and known[2] == digest:
+                # 내용은 같고 수정 시각만 바뀜
+                seen[entry.path] = (stat.st_mtime_ns, stat.st_size, digest)
+                continue
+            changed.append((entry.path, stat.st_mtime_ns, stat.st_size, digest))
+        return sorted(changed, key=lambda item: item[1])
+
+    def _read_changed(self, changed):
+        """바뀐 파일을 파일별로 읽어 성공한 파일의 (변경 정보, 워크북) 목록을 반환합니다 (실패한 파일은 errors에 기록)."""
+        files = [(os.path.basename(path), path) for path, *_ in changed]
+        workbooks = read_files(files, workers=self._workers, return_exceptions=True)
+
+        loaded = []
+        for entry, workbook in zip(changed, workbooks):
+            if isinstance(workbook, Exception):
+                # 손상된 파일은 내용이 바뀔 때까지 다시 읽지 않음
+                path, mtime_ns, size, digest = entry
+                self._failed[path] = (mtime_ns, size, digest)
+                self.errors[path] = str(workbook)
+            else:
+                loaded.append((entry, workbook))
+        return loaded
+
+    def scan(self):
+        """폴더를 한 번 확인해 바뀐 파일을 반영합니다. 반영한 파일이 있으면 True를 반환합니다."""
+        changed = self._changed_files()
+        self.last_scan = time.time()
+        if not changed:
+            return False
+
+        loaded = self._read_changed(changed)
+        if not loaded:
+            return False
+
+        try:
+            incoming = merge_catalog([workbook for _, workbook in loaded])
+            with self._lock:
+                base = self._data
+            merged, summary = merge_workbook(base, incoming)
+            if self._store is not None:
+                self._store.ingest(incoming)
+        except Exception as e:
+            # 반영하지 못한 파일은 기록하지 않으므로 다음 확인 때 다시 읽음
+            logger.exception("데이터 폴더 반영 중 오류 발생: %s", self.path)
+            for (path, *_), _ in loaded:
+                self.errors[path] = str(e)
+            return False
+
+        # 카탈로그와 이력 저장소에 모두 반영된 뒤에만 파일을 반영 완료로 기록
+        for (path, mtime_ns, size, digest), _ in loaded:
+            self._files[path] = (mtime_ns, size, digest)
+            self._failed.pop(path, None)
+            self.errors.pop(path, None)
+
+        with self._lock:
+            self._data = merged
+            self._version += 1
+        logger.info(
+            "데이터 폴더 반영: 파일 %d개, 신규 %d행, 변경 %d행",
+            len(loaded), summary['신규 행 수'].sum(), summary['변경 행 수'].sum(),
+        )
+        return True
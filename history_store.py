@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""
+측정 이력 저장소 모듈
+
+업로드된 시트 데이터를 로컬 저장소에 누적 저장하고,
+화면에 필요한 범위(항목별 최근 N개, 날짜 범위)만 골라 조회합니다.
+엑셀 한 파일이나 프로세스 메모리에 담기지 않는 여러 해의 이력도 보관할 수 있습니다.
+
+- sqlite: 하나의 SQLite 데이터베이스 파일, (sheet_name, 항목, 날짜) 인덱스로 조회
+- parquet: 시트/월별로 나눈 Parquet 파일 디렉터리, 필요한 월과 컬럼만 읽음
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from urllib.parse import quote
+
+import pandas as pd
+
+from data_loader import compact_layout, delta_rows, ingest_occurrence, merge_sheet
+
+
+# 이력 저장소 경로 (환경 변수 HISTORY_DB로 지정하면 저장소 사용, 없으면 메모리 데이터만 사용)
+HISTORY_DB_PATH = os.environ.get('HISTORY_DB')
+
+# 이력 저장소 형식 (환경 변수 HISTORY_BACKEND: 'sqlite' 또는 'parquet')
+HISTORY_BACKEND = os.environ.get('HISTORY_BACKEND', 'sqlite')
+
+# 저장하는 값 컬럼 (sheet_name, 날짜, 항목은 키 컬럼)
+VALUE_COLUMNS = ['구분', '배합', '실측', '하한선', '상한선']
+
+# 조회 결과 컬럼 순서 (엑셀 시트와 동일)
+RESULT_COLUMNS = ['날짜', '구분', '항목', '배합', '실측', '하한선', '상한선', 'sheet_name']
+
+# 날짜는 정렬과 범위 비교가 되도록 ISO 형식 문자열로 저장
+_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 기본 키 (sheet_name, 항목, 날짜, 순번)가 항목별 최근 N개 조회용 인덱스 역할을 함
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS measurements (
+    sheet_name TEXT NOT NULL,
+    항목 TEXT NOT NULL,
+    날짜 TEXT NOT NULL,
+    순번 INTEGER NOT NULL,
+    구분 TEXT,
+    배합 REAL,
+    실측 REAL,
+    하한선 REAL,
+    상한선 REAL,
+    PRIMARY KEY (sheet_name, 항목, 날짜, 순번)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_measurements_sheet_date ON measurements (sheet_name, 날짜);
+CREATE TABLE IF NOT EXISTS sheets (
+    sheet_name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    sheet_name TEXT NOT NULL,
+    항목 TEXT NOT NULL,
+    PRIMARY KEY (sheet_name, 항목)
+) WITHOUT ROWID;
+'''
+
+_STORED_COLUMNS = ['sheet_name', '항목', '날짜', '순번'] + VALUE_COLUMNS
+
+
+class SQLiteHistoryStore:
+    """
+    SQLite 기반 측정 이력 저장소입니다.
+    연결 하나를 잠금으로 보호하므로 여러 세션(스레드)이 공유할 수 있습니다.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # ingest()로 행이 추가되거나 바뀔 때마다 1씩 늘어나는 번호 (조회 결과 캐시의 키로 사용)
+        self.version = 0
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """데이터베이스 연결을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+    def _to_rows(self, df, sheet_name):
+        """데이터프레임을 저장용 행 목록으로 변환합니다 (없는 값 컬럼은 NULL)."""
+        stored = pd.DataFrame({
+            'sheet_name': sheet_name,
+            '항목': df['항목'].astype(str),
+            '날짜': df['날짜'].dt.strftime(_DATE_FORMAT),
+            '순번': ingest_occurrence(df),
+        })
+        for col in VALUE_COLUMNS:
+            if col not in df.columns:
+                stored[col] = None
+            else:
+                # NaN은 NULL로 저장
+                stored[col] = df[col].astype(object).where(df[col].notna(), None)
+        return stored[_STORED_COLUMNS].itertuples(index=False, name=None)
+
+    def ingest(self, all_data):
+        """
+        시트별 데이터를 (sheet_name, 항목, 날짜, 순번) 키로 저장소에 반영합니다.
+        새 키는 추가하고 값이 바뀐 키는 갱신하며, 저장소에만 있는 행은 그대로 둡니다.
+        반환: 시트별 신규/변경 행 수 데이터프레임
+        """
+        placeholders = ', '.join('?' * len(_STORED_COLUMNS))
+        key_match = ' AND '.join(f'm.{col} = s.{col}' for col in _STORED_COLUMNS[:4])
+        value_differs = ' OR '.join(f'm.{col} IS NOT s.{col}' for col in VALUE_COLUMNS)
+        updates = ', '.join(f'{col} = excluded.{col}' for col in VALUE_COLUMNS)
+        excluded_differs = ' OR '.join(f'{col} IS NOT excluded.{col}' for col in VALUE_COLUMNS)
+
+        rows = []
+        with self._lock, self._conn:
+            self._conn.execute('CREATE TEMP TABLE IF NOT EXISTS staging AS SELECT * FROM measurements WHERE 0')
+            for sheet_name, df in all_data.items():
+                if df.empty:
+                    continue
+                self._conn.execute('DELETE FROM staging')
+                self._conn.executemany(
+                    f'INSERT INTO staging VALUES ({placeholders})', self._to_rows(df, sheet_name)
+                )
+                n_new, n_changed = self._conn.execute(f'''
+                    SELECT
+                        SUM(m.sheet_name IS NULL),
+                        SUM(m.sheet_name IS NOT NULL AND ({value_differs}))
+                    FROM staging s LEFT JOIN measurements m ON {key_match}
+                ''').fetchone()
+                self._conn.execute(f'''
+                    INSERT INTO measurements SELECT * FROM staging WHERE true
+                    ON CONFLICT (sheet_name, 항목, 날짜, 순번) DO UPDATE SET {updates}
+                    WHERE {excluded_differs}
+                ''')
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO sheets VALUES (?, (SELECT COUNT(*) FROM sheets))',
+                    (sheet_name,),
+                )
+                self._conn.execute('INSERT OR IGNORE INTO items SELECT DISTINCT sheet_name, 항목 FROM staging')
+                rows.append({
+                    'sheet_name': sheet_name,
+                    '신규 행 수': int(n_new or 0),
+                    '변경 행 수': int(n_changed or 0),
+                })
+            self._conn.execute('DROP TABLE staging')
+            if any(row['신규 행 수'] or row['변경 행 수'] for row in rows):
+                self.version += 1
+        return pd.DataFrame(rows, columns=['sheet_name', '신규 행 수', '변경 행 수'])
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def is_empty(self):
+        """저장된 행이 하나도 없는지 여부"""
+        return not self._query('SELECT 1 FROM measurements LIMIT 1')
+
+    def sheet_names(self):
+        """저장된 시트 이름 목록 (처음 저장된 순서)"""
+        return [name for name, in self._query('SELECT sheet_name FROM sheets ORDER BY position')]
+
+    def date_bounds(self, sheet_name):
+        """시트의 (최소 날짜, 최대 날짜) Timestamp (데이터가 없으면 (None, None))"""
+        low, high = self._query(
+            'SELECT MIN(날짜), MAX(날짜) FROM measurements WHERE sheet_name = ?', (sheet_name,)
+        )[0]
+        if low is None:
+            return None, None
+        return pd.Timestamp(low), pd.Timestamp(high)
+
+    def _frame(self, records, sheet_name):
+        """조회 결과 행 목록을 앱에서 쓰는 데이터프레임 레이아웃으로 바꿉니다."""
+        df = pd.DataFrame.from_records(records, columns=['날짜', '항목'] + VALUE_COLUMNS)
+        df['날짜'] = pd.to_datetime(df['날짜'], format=_DATE_FORMAT)
+        df['sheet_name'] = sheet_name
+        return compact_layout(df[RESULT_COLUMNS])
+
+    def recent_per_item(self, sheet_name, n):
+        """항목별 최근 n개 행 (기본 키 인덱스를 역순으로 n개씩만 읽음)"""
+        columns = ', '.join(['날짜', '항목'] + VALUE_COLUMNS)
+        items = [item for item, in self._query(
+            'SELECT 항목 FROM items WHERE sheet_name = ?', (sheet_name,)
+        )]
+        records = []
+        for item in items:
+            records += self._query(
+                f'SELECT {columns} FROM measurements WHERE sheet_name = ? AND 항목 = ? '
+                f'ORDER BY 날짜 DESC, 순번 DESC LIMIT ?',
+                (sheet_name, item, n),
+            )
+        return self._frame(records, sheet_name)
+
+    def date_range(self, sheet_name, start_date=None, end_date=None):
+        """start_date ~ end_date(포함) 사이의 행 (날짜 인덱스로 범위만 읽음, None이면 제한 없음)"""
+        columns = ', '.join(['날짜', '항목'] + VALUE_COLUMNS)
+        sql = f'SELECT {columns} FROM measurements WHERE sheet_name = ?'
+        params = [sheet_name]
+        if start_date is not None:
+            sql += ' AND 날짜 >= ?'
+            params.append(pd.Timestamp(start_date).strftime(_DATE_FORMAT))
+        if end_date is not None:
+            sql += ' AND 날짜 < ?'
+            params.append((pd.Timestamp(end_date) + pd.Timedelta(days=1)).strftime(_DATE_FORMAT))
+        sql += ' ORDER BY 날짜, 항목, 순번'
+        return self._frame(self._query(sql, params), sheet_name)
+
+
+class ParquetHistoryStore:
+    """
+    시트와 월 단위로 나눈 Parquet 데이터셋 기반 측정 이력 저장소입니다.
+    디렉터리 구조: <경로>/sheet_name=<시트>/month=<YYYY-MM>/part-0.parquet
+    날짜 범위 조회는 해당 시트의 겹치는 월 파티션과 필요한 컬럼만 읽으므로
+    이력이 길어져도 선택한 기간 크기에 비례하는 만큼만 읽습니다.
+    """
+
+    _CATALOG = '_catalog.json'
+    _READ_COLUMNS = ['날짜', '항목'] + VALUE_COLUMNS
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self._path = path
+        self._lock = threading.Lock()
+        self._catalog = self._read_catalog()
+        # ingest()로 행이 추가되거나 바뀔 때마다 1씩 늘어나는 번호 (조회 결과 캐시의 키로 사용)
+        self.version = 0
+
+    def close(self):
+        """열린 자원이 없으므로 아무 것도 하지 않습니다 (SQLiteHistoryStore와 같은 인터페이스)."""
+
+    def _read_catalog(self):
+        """시트 순서와 시트별 항목 목록 (catalog 파일이 없으면 빈 목록)"""
+        try:
+            with open(os.path.join(self._path, self._CATALOG), encoding='utf-8') as f:
+                return json.load(f)['sheets']
+        except FileNotFoundError:
+            return []
+
+    def _write_catalog(self):
+        tmp_path = os.path.join(self._path, self._CATALOG + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sheets': self._catalog}, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(self._path, self._CATALOG))
+
+    def _sheet_dir(self, sheet_name):
+        # 시트 이름의 '/' 등은 퍼센트 인코딩 (hive 파티션 규칙)
+        return os.path.join(self._path, 'sheet_name=' + quote(sheet_name, safe=''))
+
+    def _partition_file(self, sheet_name, month):
+        return os.path.join(self._sheet_dir(sheet_name), f'month={month}', 'part-0.parquet')
+
+    def _months(self, sheet_name):
+        """시트에 저장된 월 파티션 목록 (오름차순)"""
+        try:
+            entries = os.listdir(self._sheet_dir(sheet_name))
+        except FileNotFoundError:
+            return []
+        return sorted(entry[len('month='):] for entry in entries if entry.startswith('month='))
+
+    def _read_partitions(self, sheet_name, months, columns, filters=None):
+        """지정한 월 파티션 파일에서 columns만 읽어 하나의 데이터프레임으로 합칩니다."""
+        files = [self._partition_file(sheet_name, month) for month in months]
+        if not files:
+            empty = pd.DataFrame(columns=columns)
+            return empty.astype({'날짜': 'datetime64[ns]'}) if '날짜' in columns else empty
+        return pd.read_parquet(files, columns=columns, filters=filters)
+
+    def _write_partition(self, sheet_name, month, df):
+        path = self._partition_file(sheet_name, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 임시 파일에 먼저 쓰고 이름을 바꿔 읽는 쪽이 불완전한 파일을 보지 않도록 함
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def ingest(self, all_data):
+        """
+        시트별 데이터를 월 파티션 단위로 (날짜, 항목, 순번) 키를 기준으로 병합해 저장합니다.
+        새로 추가되거나 바뀐 행이 있는 월 파티션만 다시 씁니다.
+        반환: 시트별 신규/변경 행 수 데이터프레임
+        """
+        rows = []
+        with self._lock:
+            catalog = {entry['name']: entry for entry in self._catalog}
+            for sheet_name, df in all_data.items():
+                if df.empty:
+                    continue
+                # 같은 날짜의 행은 항상 같은 월 파티션에 있으므로 파티션 안에서 순번을 매겨도 같음
+                incoming = compact_layout(df.reindex(columns=self._READ_COLUMNS).reset_index(drop=True))
+                incoming['날짜'] = incoming['날짜'].astype('datetime64[ns]')
+                months = incoming['날짜'].dt.strftime('%Y-%m')
+
+                # 겹치는 월의 기존 데이터를 한 번에 읽어 새로 추가되거나 바뀐 행이 있는 월만 고름
+                stored_months = sorted(set(self._months(sheet_name)) & set(months))
+                existing = compact_layout(self._read_partitions(sheet_name, stored_months, self._READ_COLUMNS))
+                existing_months = existing['날짜'].dt.strftime('%Y-%m')
+                touched = months[delta_rows(existing, incoming)].unique()
+
+                n_new = n_changed = 0
+                for month in sorted(touched):
+                    part = incoming[months == month].reset_index(drop=True)
+                    current = existing[existing_months == month].reset_index(drop=True)
+                    if current.empty:
+                        merged, new_rows, changed_rows = part.sort_values('날짜', kind='stable'), len(part), 0
+                    else:
+                        merged, new_rows, changed_rows = merge_sheet(current, part)
+                    self._write_partition(sheet_name, month, merged)
+                    n_new += new_rows
+                    n_changed += changed_rows
+
+                entry = catalog.get(sheet_name)
+                if entry is None:
+                    entry = catalog[sheet_name] = {'name': sheet_name, 'items': []}
+                    self._catalog.append(entry)
+                known = set(entry['items'])
+                entry['items'] += [item for item in df['항목'].astype(str).unique() if item not in known]
+                rows.append({'sheet_name': sheet_name, '신규 행 수': n_new, '변경 행 수': n_changed})
+            self._write_catalog()
+            if any(row['신규 행 수'] or row['변경 행 수'] for row in rows):
+                self.version += 1
+        return pd.DataFrame(rows, columns=['sheet_name', '신규 행 수', '변경 행 수'])
+
+    def is_empty(self):
+        """저장된 시트가 하나도 없는지 여부"""
+        return not self._catalog
+
+    def sheet_names(self):
+        """저장된 시트 이름 목록 (처음 저장된 순서)"""
+        return [entry['name'] for entry in self._catalog]
+
+    def date_bounds(self, sheet_name):
+        """시트의 (최소 날짜, 최대 날짜) Timestamp (첫 달과 마지막 달 파티션의 날짜 컬럼만 읽음)"""
+        months = self._months(sheet_name)
+        if not months:
+            return None, None
+        first = self._read_partitions(sheet_name, months[:1], ['날짜'])['날짜']
+        last = self._read_partitions(sheet_name, months[-1:], ['날짜'])['날짜']
+        return first.min(), last.max()
+
+    def _frame(self, df, sheet_name):
+        """조회 결과를 앱에서 쓰는 데이터프레임 레이아웃으로 바꿉니다."""
+        df = df.reset_index(drop=True)
+        df['sheet_name'] = sheet_name
+        return compact_layout(df[RESULT_COLUMNS])
+
+    def recent_per_item(self, sheet_name, n):
+        """항목별 최근 n개 행 (최근 월부터 모든 항목이 n개를 채울 때까지만 읽음)"""
+        items = next((entry['items'] for entry in self._catalog if entry['name'] == sheet_name), [])
+        months = self._months(sheet_name)
+        frames = []
+        counts = pd.Series(0, index=items)
+        # 최근 월부터 1, 2, 4, ...개월씩 묶어 읽어 파일 읽기 호출 수를 줄임
+        batch = 1
+        while months:
+            months, recent = months[:-batch], months[-batch:]
+            part = self._read_partitions(sheet_name, recent, self._READ_COLUMNS)
+            frames.append(part)
+            counts = counts.add(part['항목'].astype(str).value_counts(), fill_value=0)
+            if (counts >= n).all():
+                break
+            batch *= 2
+        if not frames:
+            return self._frame(pd.DataFrame(columns=self._READ_COLUMNS), sheet_name)
+
+        df = pd.concat(frames, ignore_index=True).iloc[::-1]
+        df = df.sort_values('날짜', ascending=False, kind='stable')
+        return self._frame(df.groupby('항목', observed=True, sort=False).head(n), sheet_name)
+
+    def date_range(self, sheet_name, start_date=None, end_date=None):
+        """start_date ~ end_date(포함) 사이의 행 (겹치는 월 파티션만 읽고 날짜 조건은 Parquet 읽기에 전달)"""
+        months = self._months(sheet_name)
+        filters = []
+        if start_date is not None:
+            start = pd.Timestamp(start_date)
+            months = [month for month in months if month >= start.strftime('%Y-%m')]
+            filters.append(('날짜', '>=', start))
+        if end_date is not None:
+            end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+            months = [month for month in months if month <= pd.Timestamp(end_date).strftime('%Y-%m')]
+            filters.append(('날짜', '<', end))
+        df = self._read_partitions(sheet_name, months, self._READ_COLUMNS, filters or None)
+        return self._frame(df, sheet_name)
+
+
+# 사용 가능한 이력 저장소 형식
+HISTORY_BACKENDS = {
+    'sqlite': SQLiteHistoryStore,
+    'parquet': ParquetHistoryStore,
+}
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+항목별 통계 모듈
+
+표시 범위 데이터의 항목별 평균, 표준편차, 이상치/부적합 여부, 편차(실측 - 배합)를
+한 번의 groupby로 계산해 카드, 차트, 표가 같은 결과를 함께 사용합니다.
+streamlit에 의존하지 않으므로 벤치마크에서도 가져올 수 있습니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# 항목별 요약 통계 컬럼
+SUMMARY_COLUMNS = [
+    '데이터 수', '평균', '표준편차', '통계적 상한선', '통계적 하한선',
+    '이상치 수', '이상치 비율(%)', '부적합 수', '부적합 비율(%)',
+    '평균 편차', '편차 표준편차', '절대 평균 편차', '편차 수', '상한선', '하한선',
+]
+
+# 이 값(평균 대비) 이하의 표준편차는 값이 모두 같은 것으로 보고 이상치를 판정하지 않음
+STD_RELATIVE_TOLERANCE = 1e-9
+
+# 배합-실측 차이 t-검정 유의수준
+SIGNIFICANCE_LEVEL = 0.05
+
+# 배합-실측 차이 판단 (통계적 판단, 기술적 판단, 색상): 높음, 낮음, 차이 없음
+DEVIATION_JUDGMENTS = {
+    'higher': (
+        "실측값이 배합값보다 통계적으로 유의하게 높음",
+        "배합 설정값이 실제 투입량보다 낮게 설정되어 있거나, 측정 과정에서 양의 편향 가능성",
+        "red",
+    ),
+    'lower': (
+        "실측값이 배합값보다 통계적으로 유의하게 낮음",
+        "공정 중 원료 손실 가능성 또는 원료 투입량이 설정값보다 적을 가능성",
+        "blue",
+    ),
+    'none': (
+        "실측값과 배합값 사이에 통계적으로 유의한 차이 없음",
+        "배합과 실측이 잘 일치함",
+        "green",
+    ),
+}
+
+
+class ItemStatistics:
+    """
+    표시 범위 데이터(df)의 항목별 통계를 sigma 기준으로 한 번에 계산합니다.
+    positions(항목 -> df의 행 위치)를 넘기면 항목별로 다시 묶지 않고 그 위치를 사용합니다 (ItemIndex.frame_positions).
+
+    summary: 항목별 요약 (인덱스: 항목, 컬럼: SUMMARY_COLUMNS)
+    rows: 행별 결과 (원본 컬럼 + 편차, 이상치, 부적합)
+    stats[item]: 항목의 행별 결과 (날짜 오름차순, 0부터 다시 매긴 인덱스)
+    """
+
+    def __init__(self, df, sigma, positions=None):
+        self.sigma = sigma
+        rows = df.reset_index(drop=True)
+        measured = rows['실측'].to_numpy(dtype=np.float64)
+        deviation = measured - rows['배합'].to_numpy(dtype=np.float64)
+        values = rows.assign(편차=deviation, 절대편차=np.abs(deviation))
+
+        item_index = None
+        if positions is None:
+            grouped = values.groupby('항목', observed=True, sort=False)
+            # 행마다 속한 항목 번호 (요약 표의 행 순서와 같음)
+            codes = grouped.ngroup().to_numpy()
+            positions = grouped.indices
+        else:
+            # 항목 순서는 groupby(sort=False)와 같이 처음 나온 행 순서
+            items = sorted(positions, key=lambda item: positions[item][0])
+            codes = np.empty(len(rows), dtype=np.intp)
+            for code, item in enumerate(items):
+                codes[positions[item]] = code
+            grouped = values.groupby(codes, sort=True)
+            item_index = pd.Index(rows['항목'].take([positions[item][0] for item in items]), name='항목')
+        agg = grouped.agg(
+            데이터_수=('실측', 'size'),
+            평균=('실측', 'mean'),
+            표준편차=('실측', 'std'),
+            평균_편차=('편차', 'mean'),
+            편차_표준편차=('편차', 'std'),
+            절대_평균_편차=('절대편차', 'mean'),
+            편차_수=('편차', 'count'),
+            상한선=('상한선', 'mean'),
+            하한선=('하한선', 'mean'),
+        )
+        agg.columns = [col.replace('_', ' ') for col in agg.columns]
+        if item_index is not None:
+            agg.index = item_index
+
+        # 항목 평균/표준편차를 행으로 펼쳐 이상치와 부적합 여부를 한 번에 판정
+        mean = agg['평균'].to_numpy()[codes]
+        std = agg['표준편차'].to_numpy()[codes]
+        with np.errstate(invalid='ignore'):
+            # 값이 모두 같은 항목도 반올림 때문에 평균이 1 ULP 어긋나거나 표준편차가 0에 가까운 값이 될 수 있으므로
+            # 평균 대비 STD_RELATIVE_TOLERANCE 이하의 퍼짐은 이상치 판정에서 제외
+            spread = std > STD_RELATIVE_TOLERANCE * np.abs(mean)
+            outlier = spread & (np.abs(measured - mean) > sigma * std)
+            out_of_spec = (
+                (measured > rows['상한선'].to_numpy(dtype=np.float64))
+                | (measured < rows['하한선'].to_numpy(dtype=np.float64))
+            )
+
+        n_groups = len(agg)
+        size = agg['데이터 수'].to_numpy()
+        agg['통계적 상한선'] = agg['평균'] + sigma * agg['표준편차']
+        agg['통계적 하한선'] = agg['평균'] - sigma * agg['표준편차']
+        agg['이상치 수'] = np.bincount(codes, weights=outlier, minlength=n_groups).astype(int)
+        agg['부적합 수'] = np.bincount(codes, weights=out_of_spec, minlength=n_groups).astype(int)
+        agg['이상치 비율(%)'] = agg['이상치 수'] / size * 100
+        agg['부적합 비율(%)'] = agg['부적합 수'] / size * 100
+
+        self.summary = agg[SUMMARY_COLUMNS]
+        self.rows = rows.assign(편차=deviation, 이상치=outlier, 부적합=out_of_spec)
+        # 항목 -> rows의 행 위치
+        self._positions = positions
+        self._codes = codes
+
+    def __getitem__(self, item):
+        """항목의 행별 결과 (날짜 오름차순), 항목이 없으면 빈 데이터프레임"""
+        pos = self._positions.get(item)
+        if pos is None:
+            return self.rows.iloc[:0]
+        item_rows = self.rows.iloc[pos]
+        dates = item_rows['날짜']
+        if dates.is_monotonic_decreasing:
+            # ItemIndex에서 온 데이터는 날짜 내림차순이므로 뒤집기만 하면 됨
+            item_rows = item_rows.iloc[::-1]
+        elif not dates.is_monotonic_increasing:
+            item_rows = item_rows.sort_values('날짜', kind='stable')
+        return item_rows.reset_index(drop=True)
+
+    def anomalies(self):
+        """
+        이상치와 (이상치가 아닌) 부적합 행의 표를 마스크와 컬럼 연산으로 만듭니다 (날짜 내림차순).
+        부적합 행은 평균 ± σ 안에 있을 때만 넣으므로 표준편차가 없는 항목(데이터 1개)의 부적합 행은 빠집니다.
+        컬럼: 항목, 날짜, 실측값, 배합값, 편차, 평균, 표준편차, 상한선, 하한선, 유형, 비고
+        """
+        rows = self.rows
+        outlier = rows['이상치'].to_numpy()
+        within = ~outlier & ~np.isnan(self.summary['표준편차'].to_numpy()[self._codes])
+        keep = outlier | (rows['부적합'].to_numpy() & within)
+        codes = self._codes[keep]
+        outlier = outlier[keep]
+        selected = rows[keep]
+
+        mean = self.summary['평균'].to_numpy()[codes]
+        std = self.summary['표준편차'].to_numpy()[codes]
+        measured = selected['실측'].to_numpy(dtype=np.float64)
+        # 이상치는 평균에서 몇 σ 벗어났는지, 부적합은 규격 이탈로 표시
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance = np.abs(measured - mean) / std
+        note = np.where(outlier, np.char.add(np.char.mod('%.2f', distance), 'σ 이탈'), '규격 이탈')
+
+        table = pd.DataFrame({
+            '항목': selected['항목'].astype(object).to_numpy(),
+            '날짜': selected['날짜'].to_numpy(),
+            '실측값': measured,
+            '배합값': selected['배합'].to_numpy(dtype=np.float64),
+            '편차': selected['편차'].to_numpy(),
+            '평균': mean,
+            '표준편차': std,
+            '상한선': selected['상한선'].to_numpy(dtype=np.float64),
+            '하한선': selected['하한선'].to_numpy(dtype=np.float64),
+            '유형': np.where(outlier, '이상치', '부적합'),
+            '비고': note,
+        })
+        return table.sort_values('날짜', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def deviation_ttest(summary):
+    """
+    항목별 편차(실측 - 배합)의 평균이 0인지 한 번에 t-검정합니다 (단일 표본, 양측).
+    요약 통계의 편차 수/평균/표준편차로 t값을 배열로 계산하고 p값은 t 분포 생존함수를 한 번만 호출합니다.
+    편차가 없는 행(NaN)은 제외하며, 값이 2개 미만인 항목의 p값은 NaN입니다.
+
+    summary: ItemStatistics.summary (여러 시트의 요약을 이어 붙인 것도 가능)
+    반환: 항목, 평균_편차, 편차_표준편차, t값, p값, 통계적_판단, 기술적_판단, 색상 컬럼의 데이터프레임
+    """
+    from scipy import stats
+
+    n = summary['편차 수'].to_numpy(dtype=np.float64)
+    mean = summary['평균 편차'].to_numpy(dtype=np.float64)
+    std = summary['편차 표준편차'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = mean / (std / np.sqrt(n))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), n - 1)
+    p_value = np.where(n >= 2, p_value, np.nan)
+
+    significant = p_value < SIGNIFICANCE_LEVEL
+    judgment = np.select(
+        [significant & (mean > 0), significant], ['higher', 'lower'], default='none'
+    )
+    labels = pd.DataFrame.from_dict(
+        DEVIATION_JUDGMENTS, orient='index', columns=['통계적_판단', '기술적_판단', '색상']
+    ).loc[judgment]
+
+    result = pd.DataFrame({
+        '항목': summary.index.to_numpy(),
+        '평균_편차': mean,
+        '편차_표준편차': std,
+        't값': t_stat,
+        'p값': p_value,
+    })
+    return pd.concat([result, labels.reset_index(drop=True)], axis=1)
+
+
+# 공정능력지수 컬럼
+CAPABILITY_COLUMNS = ['Cp', 'Cpk', 'Cpu', 'Cpl', 'PPM']
+
+
+def process_capability(mean, std, ucl, lcl):
+    """
+    공정능력지수(Cp, Cpk, Cpu, Cpl)와 예상 불량률(PPM)을 배열 단위로 계산합니다.
+    mean, std, ucl, lcl은 같은 길이의 배열(또는 스칼라)이며, 표준편차가 0이면 지수는 무한대입니다.
+    반환: CAPABILITY_COLUMNS를 키로 하는 배열 딕셔너리
+    """
+    from scipy import stats
+
+    mean, std, ucl, lcl = (np.asarray(v, dtype=np.float64) for v in (mean, std, ucl, lcl))
+    zero = std == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cp = np.where(zero, np.inf, (ucl - lcl) / (6 * std))
+        cpu = np.where(zero, np.inf, (ucl - mean) / (3 * std))
+        cpl = np.where(zero, np.inf, (mean - lcl) / (3 * std))
+        # 상한/하한 쪽 z값을 한 배열로 모아 생존함수를 한 번만 호출
+        z = np.where(zero, np.inf, np.stack([ucl - mean, mean - lcl]) / std)
+    # 규격 한계가 한쪽만 있으면 없는 쪽 꼬리는 0으로 보고, 양쪽 다 없을 때만 NaN
+    tails = stats.norm.sf(z)
+    ppm = np.where(np.isnan(tails).all(axis=0), np.nan, np.nansum(tails, axis=0)) * 1000000
+
+    return {
+        'Cp': cp,
+        # 한쪽 규격만 있으면 그쪽 지수가 Cpk
+        'Cpk': np.fmin(cpu, cpl),
+        'Cpu': cpu,
+        'Cpl': cpl,
+        'PPM': ppm,
+    }
+
+
+def capability_matrix(all_data):
+    """
+    모든 시트의 모든 항목에 대해 공정능력지수를 한 번에 계산합니다.
+    시트를 이어 붙여 (시트, 항목)별 평균/표준편차/평균 규격 한계를 한 번의 groupby로 구한 뒤
+    process_capability로 배열 계산합니다.
+
+    all_data: 시트 이름 -> 데이터프레임 (딕셔너리 또는 LazyWorkbook)
+    반환: 시트, 항목, 데이터 수, 평균, 표준편차, 상한선, 하한선, Cp, Cpk, Cpu, Cpl, PPM 컬럼의 데이터프레임
+    """
+    columns = ['항목', '실측', '상한선', '하한선']
+    frames = {
+        sheet_name: df.reindex(columns=columns)
+        for sheet_name, df in all_data.items()
+        if not df.empty
+    }
+    result_columns = ['시트', '항목', '데이터 수', '평균', '표준편차', '상한선', '하한선'] + CAPABILITY_COLUMNS
+    if not frames:
+        return pd.DataFrame(columns=result_columns)
+
+    # 시트마다 다른 항목 범주를 합치면 문자열이 되므로 시트 이름과 함께 한 번에 묶음
+    combined = pd.concat(frames, names=['시트', None]).reset_index(level='시트')
+    summary = combined.groupby(['시트', '항목'], observed=True, sort=False).agg(
+        데이터_수=('실측', 'size'),
+        평균=('실측', 'mean'),
+        표준편차=('실측', 'std'),
+        상한선=('상한선', 'mean'),
+        하한선=('하한선', 'mean'),
+    )
+    summary.columns = [col.replace('_', ' ') for col in summary.columns]
+
+    capability = process_capability(
+        summary['평균'], summary['표준편차'], summary['상한선'], summary['하한선']
+    )
+    return summary.assign(**capability).reset_index()[result_columns]